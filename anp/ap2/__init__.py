@@ -38,8 +38,12 @@ from .mandate import (
     b64url_no_pad,
     build_mandate,
     compute_hash,
+    compute_hash_bytes,
     jcs_canonicalize,
+    load_private_key,
+    load_public_key,
     validate_mandate,
+    verify_mandate,
 )
 
 __all__ = [
@@ -70,9 +74,13 @@ __all__ = [
     "FulfillmentReceiptContents",
     # Utilities
     "compute_hash",
+    "compute_hash_bytes",
     "b64url_no_pad",
     "jcs_canonicalize",
+    "load_private_key",
+    "load_public_key",
     # Functional Mandate API
     "build_mandate",
+    "verify_mandate",
     "validate_mandate",
 ]
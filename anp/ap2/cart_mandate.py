@@ -4,14 +4,25 @@ This module provides signing helpers for CartMandate contents plus
 helper validation utilities for merchants and shoppers.
 """
 
-from anp.ap2.mandate import build_mandate, validate_mandate
+import asyncio
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from anp.ap2.mandate import (
+    PrivateKeyLike,
+    PublicKeyLike,
+    _jws_headers,
+    build_mandate,
+    load_private_key,
+    verify_mandate,
+)
 from anp.ap2.models import CartMandate
 
 
 def build_cart_mandate(
     contents: dict,
     shopper_did: str,
-    merchant_private_key: str,
+    merchant_private_key: PrivateKeyLike,
     merchant_did: str,
     merchant_kid: str,
     algorithm: str = "ES256K",
@@ -25,7 +36,7 @@ def build_cart_mandate(
     Args:
         contents: Cart contents as plain dict (developer-controlled structure).
         shopper_did: Shopper's DID (audience).
-        merchant_private_key: Merchant's private key in PEM format.
+        merchant_private_key: Merchant's private key (PEM or parsed key object).
         merchant_did: Merchant's DID (issuer and subject).
         merchant_kid: Merchant's key ID for JWT header.
         algorithm: JWT algorithm (default: ES256K).
@@ -33,7 +44,8 @@ def build_cart_mandate(
 
     Returns:
         CartMandate instance with contents and merchant_authorization.
-        JWT payload contains "cart_hash" field.
+        JWT payload contains "cart_hash" field; the same value is cached on
+        the returned model as ``cart_mandate.cart_hash``.
 
     Example:
         >>> cart = build_cart_mandate(
@@ -47,11 +59,7 @@ def build_cart_mandate(
         >>> cart.merchant_authorization  # str (JWS)
     """
     # Prepare headers
-    headers = {
-        "alg": algorithm,
-        "kid": merchant_kid,
-        "typ": "JWT",
-    }
+    headers = _jws_headers(algorithm, merchant_kid)
 
     # Use core build_mandate function with CartMandate-specific hash field name
     mandate_dict = build_mandate(
@@ -67,33 +75,91 @@ def build_cart_mandate(
     )
 
     # Convert to CartMandate model using Pydantic helper
-    return CartMandate.model_validate(
+    cart_mandate = CartMandate.model_validate(
         {
             "contents": mandate_dict["contents"],
             "merchant_authorization": mandate_dict["auth"],
         }
     )
+    cart_mandate._cart_hash = mandate_dict["cart_hash"]
+    return cart_mandate
 
 
-def validate_cart_mandate(
+def build_cart_mandates(
+    orders: Iterable[Tuple[dict, str]],
+    merchant_private_key: PrivateKeyLike,
+    merchant_did: str,
+    merchant_kid: str,
+    algorithm: str = "ES256K",
+    ttl_seconds: int = 900,
+) -> List[CartMandate]:
+    """Sign many CartMandate contents with one merchant key.
+
+    Batch variant of build_cart_mandate for merchants issuing carts in bulk.
+    The signing key is parsed once, the JWT header is built once, and all
+    mandates share one issued-at timestamp instead of reading the clock per
+    order.
+
+    Args:
+        orders: Iterable of (contents, shopper_did) pairs.
+        merchant_private_key: Merchant's private key (PEM or parsed key object).
+        merchant_did: Merchant's DID (issuer and subject).
+        merchant_kid: Merchant's key ID for JWT header.
+        algorithm: JWT algorithm (default: ES256K).
+        ttl_seconds: Time-to-live in seconds (default: 900).
+
+    Returns:
+        List of CartMandate instances in the same order as ``orders``.
+    """
+    signing_key = load_private_key(merchant_private_key)
+    headers = _jws_headers(algorithm, merchant_kid)
+    issued_at = time.time_ns() // 1_000_000_000
+
+    cart_mandates = []
+    for contents, shopper_did in orders:
+        mandate_dict = build_mandate(
+            contents=contents,
+            private_key=signing_key,
+            headers=headers,
+            iss=merchant_did,
+            sub=merchant_did,
+            aud=shopper_did,
+            ttl_seconds=ttl_seconds,
+            algorithm=algorithm,
+            hash_field_name="cart_hash",
+            issued_at=issued_at,
+        )
+        cart_mandate = CartMandate.model_validate(
+            {
+                "contents": mandate_dict["contents"],
+                "merchant_authorization": mandate_dict["auth"],
+            }
+        )
+        cart_mandate._cart_hash = mandate_dict["cart_hash"]
+        cart_mandates.append(cart_mandate)
+    return cart_mandates
+
+
+def verify_cart_mandate(
     cart_mandate: CartMandate,
-    merchant_public_key: str,
+    merchant_public_key: PublicKeyLike,
     merchant_algorithm: str,
     expected_shopper_did: str,
-) -> bool:
-    """Validate CartMandate signature and content hash.
+) -> Optional[str]:
+    """Verify CartMandate signature and content hash, returning its cart_hash.
 
-    Wraps the core validate_mandate with CartMandate-specific configuration
-    and accepts typed CartMandate model.
+    Performs the same checks as validate_cart_mandate but returns the verified
+    cart_hash, so the receiver can chain it into a PaymentMandate without
+    hashing the contents again.
 
     Args:
-        cart_mandate: CartMandate instance to validate.
-        merchant_public_key: Merchant's public key for verification.
+        cart_mandate: CartMandate instance to verify.
+        merchant_public_key: Merchant's public key (PEM or parsed key object).
         merchant_algorithm: JWT algorithm (e.g., ES256K).
         expected_shopper_did: DID of the shopper (expected audience).
 
     Returns:
-        True if the mandate signature and content hash are valid, False otherwise.
+        The verified cart_hash, or None if the mandate is invalid.
     """
 
     # Support both Pydantic model and dict
@@ -108,7 +174,7 @@ def validate_cart_mandate(
             "auth": cart_mandate.merchant_authorization,
         }
 
-    return validate_mandate(
+    return verify_mandate(
         mandate=mandate_dict,
         public_key=merchant_public_key,
         algorithm=merchant_algorithm,
@@ -118,7 +184,61 @@ def validate_cart_mandate(
     )
 
 
+def validate_cart_mandate(
+    cart_mandate: CartMandate,
+    merchant_public_key: PublicKeyLike,
+    merchant_algorithm: str,
+    expected_shopper_did: str,
+) -> bool:
+    """Validate CartMandate signature and content hash.
+
+    Wraps the core validate_mandate with CartMandate-specific configuration
+    and accepts typed CartMandate model.
+
+    Args:
+        cart_mandate: CartMandate instance to validate.
+        merchant_public_key: Merchant's public key (PEM or parsed key object).
+        merchant_algorithm: JWT algorithm (e.g., ES256K).
+        expected_shopper_did: DID of the shopper (expected audience).
+
+    Returns:
+        True if the mandate signature and content hash are valid, False otherwise.
+    """
+    return (
+        verify_cart_mandate(
+            cart_mandate=cart_mandate,
+            merchant_public_key=merchant_public_key,
+            merchant_algorithm=merchant_algorithm,
+            expected_shopper_did=expected_shopper_did,
+        )
+        is not None
+    )
+
+
+async def validate_cart_mandate_async(
+    cart_mandate: CartMandate,
+    merchant_public_key: PublicKeyLike,
+    merchant_algorithm: str,
+    expected_shopper_did: str,
+) -> bool:
+    """Run validate_cart_mandate in a worker thread.
+
+    Signature verification is CPU-bound; awaiting this from a request handler
+    keeps the event loop free to serve other connections meanwhile.
+    """
+    return await asyncio.to_thread(
+        validate_cart_mandate,
+        cart_mandate=cart_mandate,
+        merchant_public_key=merchant_public_key,
+        merchant_algorithm=merchant_algorithm,
+        expected_shopper_did=expected_shopper_did,
+    )
+
+
 __all__ = [
     "build_cart_mandate",
+    "build_cart_mandates",
+    "verify_cart_mandate",
     "validate_cart_mandate",
+    "validate_cart_mandate_async",
 ]
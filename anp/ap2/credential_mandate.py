@@ -4,9 +4,18 @@ This module provides high-level functions for building and verifying
 PaymentReceipt and FulfillmentReceipt credentials.
 """
 
-import jwt
-
-from anp.ap2.mandate import build_mandate, validate_mandate
+import asyncio
+import time
+from typing import Iterable, List, Optional, Tuple, Type, TypeVar, Union
+
+from anp.ap2.mandate import (
+    PrivateKeyLike,
+    PublicKeyLike,
+    _jws_headers,
+    build_mandate,
+    load_private_key,
+    verify_mandate,
+)
 from anp.ap2.models import (
     FulfillmentReceipt,
     FulfillmentReceiptContents,
@@ -21,7 +30,7 @@ def build_payment_receipt(
     shopper_did: str,
     merchant_did: str,
     merchant_kid: str,
-    merchant_private_key: str,
+    merchant_private_key: PrivateKeyLike,
     algorithm: str = "ES256K",
     ttl_seconds: int = 15552000,
 ) -> PaymentReceipt:
@@ -35,7 +44,7 @@ def build_payment_receipt(
         shopper_did: Shopper DID
         merchant_did: Merchant DID
         merchant_kid: Merchant key identifier
-        merchant_private_key: Merchant private key
+        merchant_private_key: Merchant private key (PEM or parsed key object)
         algorithm: JWT signing algorithm
         ttl_seconds: Time to live in seconds
 
@@ -45,15 +54,16 @@ def build_payment_receipt(
     if not isinstance(contents, PaymentReceiptContents):
         raise TypeError("contents must be a PaymentReceiptContents instance")
 
-    # Ensure contents include pmt_hash
-    contents_with_chain = contents.model_copy(update={"pmt_hash": pmt_hash})
-    contents_dict = contents_with_chain.model_dump(exclude_none=True)
+    # Call the pydantic-core serializer directly, skipping model_dump's
+    # Python-side argument handling; the output is identical
+    contents_dict = type(contents).__pydantic_serializer__.to_python(
+        contents, exclude_none=True
+    )
+    # Chain to the PaymentMandate on the dump itself rather than copying the
+    # model first; pmt_hash is a required field, so its key is already there
+    contents_dict["pmt_hash"] = pmt_hash
 
-    headers = {
-        "alg": algorithm,
-        "kid": merchant_kid,
-        "typ": "JWT",
-    }
+    headers = _jws_headers(algorithm, merchant_kid)
 
     mandate = build_mandate(
         contents=contents_dict,
@@ -67,9 +77,11 @@ def build_payment_receipt(
         hash_field_name="cred_hash",
     )
 
-    return PaymentReceipt.model_validate(
+    receipt = PaymentReceipt.model_validate(
         {"contents": contents_dict, "merchant_authorization": mandate["auth"]}
     )
+    receipt._cred_hash = mandate["cred_hash"]
+    return receipt
 
 
 def build_fulfillment_receipt(
@@ -78,7 +90,7 @@ def build_fulfillment_receipt(
     shopper_did: str,
     merchant_did: str,
     merchant_kid: str,
-    merchant_private_key: str,
+    merchant_private_key: PrivateKeyLike,
     algorithm: str = "ES256K",
     ttl_seconds: int = 15552000,
 ) -> FulfillmentReceipt:
@@ -92,7 +104,7 @@ def build_fulfillment_receipt(
         shopper_did: Shopper DID
         merchant_did: Merchant DID
         merchant_kid: Merchant key identifier
-        merchant_private_key: Merchant private key
+        merchant_private_key: Merchant private key (PEM or parsed key object)
         algorithm: JWT signing algorithm
         ttl_seconds: Time to live in seconds
 
@@ -102,14 +114,12 @@ def build_fulfillment_receipt(
     if not isinstance(contents, FulfillmentReceiptContents):
         raise TypeError("contents must be a FulfillmentReceiptContents instance")
 
-    contents_with_chain = contents.model_copy(update={"pmt_hash": pmt_hash})
-    contents_dict = contents_with_chain.model_dump(exclude_none=True)
+    contents_dict = type(contents).__pydantic_serializer__.to_python(
+        contents, exclude_none=True
+    )
+    contents_dict["pmt_hash"] = pmt_hash
 
-    headers = {
-        "alg": algorithm,
-        "kid": merchant_kid,
-        "typ": "JWT",
-    }
+    headers = _jws_headers(algorithm, merchant_kid)
 
     mandate = build_mandate(
         contents=contents_dict,
@@ -123,24 +133,222 @@ def build_fulfillment_receipt(
         hash_field_name="cred_hash",
     )
 
-    return FulfillmentReceipt.model_validate(
+    receipt = FulfillmentReceipt.model_validate(
         {"contents": contents_dict, "merchant_authorization": mandate["auth"]}
     )
+    receipt._cred_hash = mandate["cred_hash"]
+    return receipt
+
+
+_ReceiptT = TypeVar("_ReceiptT", PaymentReceipt, FulfillmentReceipt)
+_ContentsT = Union[PaymentReceiptContents, FulfillmentReceiptContents]
+
+
+def _build_receipts(
+    receipt_cls: Type[_ReceiptT],
+    contents_cls: Type[_ContentsT],
+    receipts: Iterable[Tuple[_ContentsT, str, str]],
+    merchant_did: str,
+    merchant_kid: str,
+    merchant_private_key: PrivateKeyLike,
+    algorithm: str,
+    ttl_seconds: int,
+) -> List[_ReceiptT]:
+    signing_key = load_private_key(merchant_private_key)
+    headers = _jws_headers(algorithm, merchant_kid)
+    issued_at = time.time_ns() // 1_000_000_000
+    serializer = contents_cls.__pydantic_serializer__
+
+    built = []
+    for contents, pmt_hash, shopper_did in receipts:
+        if not isinstance(contents, contents_cls):
+            raise TypeError(f"contents must be a {contents_cls.__name__} instance")
+        contents_dict = serializer.to_python(contents, exclude_none=True)
+        contents_dict["pmt_hash"] = pmt_hash
+        mandate = build_mandate(
+            contents=contents_dict,
+            private_key=signing_key,
+            headers=headers,
+            iss=merchant_did,
+            sub=merchant_did,
+            aud=shopper_did,
+            ttl_seconds=ttl_seconds,
+            algorithm=algorithm,
+            hash_field_name="cred_hash",
+            issued_at=issued_at,
+        )
+        receipt = receipt_cls.model_validate(
+            {"contents": contents_dict, "merchant_authorization": mandate["auth"]}
+        )
+        receipt._cred_hash = mandate["cred_hash"]
+        built.append(receipt)
+    return built
+
+
+def build_payment_receipts(
+    receipts: Iterable[Tuple[PaymentReceiptContents, str, str]],
+    merchant_did: str,
+    merchant_kid: str,
+    merchant_private_key: PrivateKeyLike,
+    algorithm: str = "ES256K",
+    ttl_seconds: int = 15552000,
+) -> List[PaymentReceipt]:
+    """Build many PaymentReceipts with one merchant key.
+
+    Batch variant of build_payment_receipt for bulk issuance runs. The
+    signing key is parsed once, the JWT header is built once, and all
+    receipts share one issued-at timestamp.
+
+    Args:
+        receipts: Iterable of (contents, pmt_hash, shopper_did) tuples
+        merchant_did: Merchant DID
+        merchant_kid: Merchant key identifier
+        merchant_private_key: Merchant private key (PEM or parsed key object)
+        algorithm: JWT signing algorithm
+        ttl_seconds: Time to live in seconds
+
+    Returns:
+        List of PaymentReceipt objects in the same order as ``receipts``
+    """
+    return _build_receipts(
+        PaymentReceipt,
+        PaymentReceiptContents,
+        receipts,
+        merchant_did,
+        merchant_kid,
+        merchant_private_key,
+        algorithm,
+        ttl_seconds,
+    )
+
+
+def build_fulfillment_receipts(
+    receipts: Iterable[Tuple[FulfillmentReceiptContents, str, str]],
+    merchant_did: str,
+    merchant_kid: str,
+    merchant_private_key: PrivateKeyLike,
+    algorithm: str = "ES256K",
+    ttl_seconds: int = 15552000,
+) -> List[FulfillmentReceipt]:
+    """Build many FulfillmentReceipts with one merchant key.
+
+    Batch variant of build_fulfillment_receipt, e.g. for end-of-day
+    fulfillment runs. See build_payment_receipts.
+
+    Args:
+        receipts: Iterable of (contents, pmt_hash, shopper_did) tuples
+        merchant_did: Merchant DID
+        merchant_kid: Merchant key identifier
+        merchant_private_key: Merchant private key (PEM or parsed key object)
+        algorithm: JWT signing algorithm
+        ttl_seconds: Time to live in seconds
+
+    Returns:
+        List of FulfillmentReceipt objects in the same order as ``receipts``
+    """
+    return _build_receipts(
+        FulfillmentReceipt,
+        FulfillmentReceiptContents,
+        receipts,
+        merchant_did,
+        merchant_kid,
+        merchant_private_key,
+        algorithm,
+        ttl_seconds,
+    )
+
+
+# Expected contents.credential_type for each receipt model
+_CREDENTIAL_TYPES = {
+    PaymentReceipt: "PaymentReceipt",
+    FulfillmentReceipt: "FulfillmentReceipt",
+}
+
+
+def _credential_fields_match(
+    credential: PaymentReceipt | FulfillmentReceipt,
+    expected_pmt_hash: str,
+) -> bool:
+    """Check credential_type and the pmt_hash link without any crypto.
+
+    A wrong type or broken hash chain is rejected before paying for signature
+    verification or hashing the contents. Both fields are still covered by
+    cred_hash, which verify_mandate checks afterwards, so running these
+    first does not weaken anything.
+    """
+    expected_cred_type = _CREDENTIAL_TYPES.get(type(credential))
+    if expected_cred_type is None:
+        # Subclasses miss the exact-type lookup; resolve them the slow way
+        for cls, cred_type in _CREDENTIAL_TYPES.items():
+            if isinstance(credential, cls):
+                expected_cred_type = cred_type
+                break
+        else:
+            raise TypeError(
+                f"Unsupported credential type: {type(credential).__name__}"
+            )
+
+    contents = credential.contents
+    return (
+        contents.get("credential_type") == expected_cred_type
+        and contents.get("pmt_hash") == expected_pmt_hash
+    )
+
+
+def verify_credential(
+    credential: PaymentReceipt | FulfillmentReceipt,
+    expected_shopper_did: str,
+    merchant_public_key: PublicKeyLike,
+    merchant_algorithm: str,
+    expected_pmt_hash: str,
+) -> Optional[str]:
+    """Verify a Credential (PaymentReceipt or FulfillmentReceipt), returning its cred_hash.
+
+    Performs the same checks as validate_credential but returns the verified
+    cred_hash, so the receiver can record or chain it without hashing the
+    contents again.
+
+    Args:
+        credential: PaymentReceipt or FulfillmentReceipt to verify.
+        expected_shopper_did: DID of the shopper (expected audience).
+        merchant_public_key: Merchant's public key (PEM or parsed key object).
+        merchant_algorithm: JWT algorithm (e.g., ES256K).
+        expected_pmt_hash: Hash of the preceding PaymentMandate in the chain.
+
+    Returns:
+        The verified cred_hash, or None if the credential is invalid.
+
+    Raises:
+        TypeError: If the credential type is unsupported.
+    """
+    if not _credential_fields_match(credential, expected_pmt_hash):
+        return None
+
+    return verify_mandate(
+        mandate={
+            "contents": credential.contents,
+            "auth": credential.merchant_authorization,
+        },
+        public_key=merchant_public_key,
+        algorithm=merchant_algorithm,
+        expected_audience=expected_shopper_did,
+        hash_field_name="cred_hash",
+    )
 
 
 def validate_credential(
     credential: PaymentReceipt | FulfillmentReceipt,
     expected_shopper_did: str,
-    merchant_public_key: str,
+    merchant_public_key: PublicKeyLike,
     merchant_algorithm: str,
     expected_pmt_hash: str,
 ) -> bool:
-    """Validate a Credential (PaymentReceipt or FulfillmentReceipt) and return the payload.
+    """Validate a Credential (PaymentReceipt or FulfillmentReceipt).
 
     Args:
         credential: PaymentReceipt or FulfillmentReceipt to validate.
         expected_shopper_did: DID of the shopper (expected audience).
-        merchant_public_key: Merchant's public key for verification.
+        merchant_public_key: Merchant's public key (PEM or parsed key object).
         merchant_algorithm: JWT algorithm (e.g., ES256K).
         expected_pmt_hash: Hash of the preceding PaymentMandate in the chain.
 
@@ -149,46 +357,78 @@ def validate_credential(
 
     Raises:
         TypeError: If the credential type is unsupported.
-        jwt.InvalidTokenError: If JWT decoding fails (allowing caller to inspect failure reason).
     """
-    if isinstance(credential, PaymentReceipt):
-        expected_cred_type = "PaymentReceipt"
-    elif isinstance(credential, FulfillmentReceipt):
-        expected_cred_type = "FulfillmentReceipt"
-    else:
-        raise TypeError(f"Unsupported credential type: {type(credential).__name__}")
-
-    credential_dict = {
-        "contents": credential.contents,
-        "auth": credential.merchant_authorization,
-    }
-
-    if not validate_mandate(
-        mandate=credential_dict,
+    return (
+        verify_credential(
+            credential=credential,
+            expected_shopper_did=expected_shopper_did,
+            merchant_public_key=merchant_public_key,
+            merchant_algorithm=merchant_algorithm,
+            expected_pmt_hash=expected_pmt_hash,
+        )
+        is not None
+    )
+
+
+async def verify_credential_async(
+    credential: PaymentReceipt | FulfillmentReceipt,
+    expected_shopper_did: str,
+    merchant_public_key: PublicKeyLike,
+    merchant_algorithm: str,
+    expected_pmt_hash: str,
+) -> Optional[str]:
+    """Run verify_credential with signature verification in a worker thread.
+
+    Signature verification is CPU-bound; awaiting this from a webhook handler
+    keeps the event loop free to serve other connections meanwhile. The cheap
+    type and hash-chain checks run inline, so a doomed credential is rejected
+    without a thread hand-off.
+    """
+    if not _credential_fields_match(credential, expected_pmt_hash):
+        return None
+
+    return await asyncio.to_thread(
+        verify_mandate,
+        mandate={
+            "contents": credential.contents,
+            "auth": credential.merchant_authorization,
+        },
         public_key=merchant_public_key,
         algorithm=merchant_algorithm,
         expected_audience=expected_shopper_did,
         hash_field_name="cred_hash",
-    ):
-        return False
-
-    payload = jwt.decode(
-        credential.merchant_authorization,
-        merchant_public_key,
-        algorithms=[merchant_algorithm],
-        audience=expected_shopper_did,
     )
 
-    if payload.get("credential_type") != expected_cred_type:
-        return False
 
-    return credential.contents.get("pmt_hash") == expected_pmt_hash
+async def validate_credential_async(
+    credential: PaymentReceipt | FulfillmentReceipt,
+    expected_shopper_did: str,
+    merchant_public_key: PublicKeyLike,
+    merchant_algorithm: str,
+    expected_pmt_hash: str,
+) -> bool:
+    """Boolean counterpart of verify_credential_async."""
+    return (
+        await verify_credential_async(
+            credential=credential,
+            expected_shopper_did=expected_shopper_did,
+            merchant_public_key=merchant_public_key,
+            merchant_algorithm=merchant_algorithm,
+            expected_pmt_hash=expected_pmt_hash,
+        )
+        is not None
+    )
 
 
 __all__ = [
     # Building functions
     "build_payment_receipt",
     "build_fulfillment_receipt",
+    "build_payment_receipts",
+    "build_fulfillment_receipts",
     # Verification
+    "verify_credential",
+    "verify_credential_async",
     "validate_credential",
+    "validate_credential_async",
 ]
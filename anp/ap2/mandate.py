@@ -29,17 +29,35 @@ Example:
 import base64
 import hashlib
 import json
+import secrets
+import threading
 import time
-import uuid
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Union
 
 import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.types import (
+    PrivateKeyTypes,
+    PublicKeyTypes,
+)
+
+PrivateKeyLike = Union[str, bytes, PrivateKeyTypes]
+PublicKeyLike = Union[str, bytes, PublicKeyTypes]
+
+
+# json.dumps() builds a fresh JSONEncoder whenever non-default options are
+# passed; one shared instance keeps the C encoder setup off the hash path.
+_JCS_ENCODER = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), sort_keys=True
+)
 
 
 def jcs_canonicalize(obj: Dict[str, Any]) -> str:
     """Canonicalize a JSON object using RFC 8785 (JCS)."""
 
-    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    return _JCS_ENCODER.encode(obj)
 
 
 def b64url_no_pad(data: bytes) -> str:
@@ -48,12 +66,80 @@ def b64url_no_pad(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
 
 
+def compute_hash_bytes(canonical: bytes) -> str:
+    """Hash already-canonical UTF-8 JSON bytes with SHA-256.
+
+    Use this when the JCS form of the contents is already at hand, to skip a
+    second canonicalization pass. The result matches compute_hash.
+
+    Only pass JCS output here. Pydantic's model_dump_json() emits fields in
+    declaration order, not sorted, so hashing it directly yields a different
+    digest than the one peers recompute from the contents.
+
+    The digest is taken in a single hashlib.sha256(data) call rather than
+    incremental update()s, so the whole buffer goes to OpenSSL (and its
+    SHA-NI code path where available) in one step.
+    """
+
+    return b64url_no_pad(hashlib.sha256(canonical).digest())
+
+
 def compute_hash(contents: dict) -> str:
     """Hash a JSON object using SHA-256 over JCS canonicalization."""
 
-    canonical = jcs_canonicalize(contents)
-    digest = hashlib.sha256(canonical.encode("utf-8")).digest()
-    return b64url_no_pad(digest)
+    return compute_hash_bytes(jcs_canonicalize(contents).encode("utf-8"))
+
+
+@lru_cache(maxsize=64)
+def _load_pem_private_key(pem: bytes) -> PrivateKeyTypes:
+    return serialization.load_pem_private_key(pem, password=None)
+
+
+# A merchant verifies mandates from many distinct shoppers, so the public key
+# cache is sized well above the handful of local signing keys
+@lru_cache(maxsize=4096)
+def _load_pem_public_key(pem: bytes) -> PublicKeyTypes:
+    return serialization.load_pem_public_key(pem)
+
+
+def load_private_key(key: PrivateKeyLike) -> PrivateKeyLike:
+    """Parse a PEM private key once and reuse the key object afterwards.
+
+    PyJWT re-parses PEM input on every ``jwt.encode`` call. Parsed key objects
+    are cached per PEM so repeated signing only pays for the signature itself.
+    Key objects and non-PEM secrets are returned unchanged.
+    """
+
+    pem = key.encode("utf-8") if isinstance(key, str) else key
+    if isinstance(pem, bytes) and pem.lstrip().startswith(b"-----BEGIN"):
+        return _load_pem_private_key(pem)
+    return key
+
+
+def load_public_key(key: PublicKeyLike) -> PublicKeyLike:
+    """Parse a PEM public key once and reuse the key object afterwards.
+
+    Counterpart of ``load_private_key`` for the ``jwt.decode`` path.
+    """
+
+    pem = key.encode("utf-8") if isinstance(key, str) else key
+    if isinstance(pem, bytes) and pem.lstrip().startswith(b"-----BEGIN"):
+        header = pem.lstrip().split(b"\n", 1)[0].rstrip()
+        if header.endswith(b"PUBLIC KEY-----"):
+            return _load_pem_public_key(pem)
+    return key
+
+
+@lru_cache(maxsize=256)
+def _jws_headers(algorithm: str, kid: str) -> Dict[str, Any]:
+    """Return the shared JWS header dict for an (algorithm, kid) pair.
+
+    Signers use a handful of fixed keys, so the header is built once per pair
+    rather than per signature. PyJWT copies headers into its own dict and
+    never mutates the one passed in; treat the result as read-only.
+    """
+
+    return {"alg": algorithm, "kid": kid, "typ": "JWT"}
 
 
 def build_mandate(
@@ -62,10 +148,11 @@ def build_mandate(
     iss: str,
     sub: str,
     aud: str,
-    private_key: str,
+    private_key: PrivateKeyLike,
     algorithm: str = "ES256K",
     ttl_seconds: int = 900,
     hash_field_name: str = "content_hash",
+    issued_at: Optional[int] = None,
 ) -> dict:
     """Build mandate with JWT-based signature.
 
@@ -75,7 +162,7 @@ def build_mandate(
 
     Args:
         contents: Developer-assembled dict with any structure.
-        private_key: JWS signing key in PEM format.
+        private_key: JWS signing key in PEM format or as a parsed key object.
         headers: JWT headers dict (must include alg, kid, typ).
         iss: Issuer claim (typically DID of the signer).
         sub: Subject claim (typically DID of the entity being signed).
@@ -84,10 +171,14 @@ def build_mandate(
         algorithm: JWT algorithm for signing (default: ES256K).
         hash_field_name: Name of hash field in JWT payload (default: "content_hash").
                         Can be "cart_hash", "pmt_hash", etc. for semantic clarity.
-        extra_payload: Optional mapping of additional claims to merge into the payload.
+        issued_at: Optional "iat" in Unix seconds (default: current time). Batch
+                   builders pass one value for the whole batch.
 
     Returns:
-        Dict with structure: {"contents": {...}, "auth": "JWS..."}
+        Dict with structure:
+        {"contents": {...}, "auth": "JWS...", "<hash_field_name>": "..."}
+        The hash entry echoes the signed content hash so callers chaining the
+        mandate do not need to canonicalize and hash the contents again.
         The auth field contains JWT with payload:
         {
             "iss": ..., "sub": ..., "aud": ...,
@@ -111,13 +202,13 @@ def build_mandate(
     content_hash = compute_hash(contents)
 
     # Create JWT payload with standard claims
-    now = int(time.time())
+    now = time.time_ns() // 1_000_000_000 if issued_at is None else issued_at
     payload = {
         "iss": iss,
         "sub": sub,
         "iat": now,
         "exp": now + ttl_seconds,
-        "jti": str(uuid.uuid4()),
+        "jti": secrets.token_hex(16),
         hash_field_name: content_hash,  # Flexible field name
     }
     if aud is not None:
@@ -126,7 +217,7 @@ def build_mandate(
     # Sign payload
     auth_token = jwt.encode(
         payload=payload,
-        key=private_key,
+        key=load_private_key(private_key),
         algorithm=algorithm,
         headers=headers,
     )
@@ -134,12 +225,140 @@ def build_mandate(
     return {
         "contents": contents,
         "auth": auth_token,
+        hash_field_name: content_hash,
     }
 
 
+# PyJWT decode options keyed by (verify_time, has_audience). PyJWT merges these
+# into its own defaults without mutating them, so they are shared across calls.
+_DECODE_OPTIONS: Dict[Tuple[bool, bool], Dict[str, bool]] = {
+    (True, True): {"verify_exp": True},
+    (True, False): {"verify_exp": True, "verify_aud": False},
+    (False, True): {"verify_exp": False, "verify_iat": False, "verify_nbf": False},
+    (False, False): {
+        "verify_exp": False,
+        "verify_iat": False,
+        "verify_nbf": False,
+        "verify_aud": False,
+    },
+}
+
+# Upper bound on accepted JWS length. Mandates carry a hash of the contents,
+# not the contents, so real tokens stay well under 1 KiB; anything larger is
+# rejected before any base64 decoding or signature work is done.
+_MAX_JWS_LENGTH = 16 * 1024
+
+_VERIFIED_TOKENS: "OrderedDict[tuple, Tuple[Any, Dict[str, Any]]]" = OrderedDict()
+_VERIFIED_TOKENS_MAXSIZE = 1024
+_VERIFIED_TOKENS_LOCK = threading.Lock()
+
+
+def _decode_verified(
+    auth_token: str,
+    public_key: PublicKeyLike,
+    algorithm: str,
+    expected_audience: Optional[str],
+    verify_time: bool,
+) -> Dict[str, Any]:
+    """Verify a JWS and return its payload, reusing earlier verifications.
+
+    Verification is deterministic for a given (token, key, algorithm, audience),
+    so successful results are kept in a bounded LRU. Retries and replayed
+    webhooks then skip the signature check; only "exp" is re-checked against
+    the clock on a hit.
+    """
+    key = load_public_key(public_key)
+    # Parsed key objects are not hashable; key them by identity and hold a
+    # reference in the entry so the id cannot be recycled while cached.
+    key_id = public_key if isinstance(public_key, (str, bytes)) else id(key)
+    cache_key = (auth_token, key_id, algorithm, expected_audience, verify_time)
+
+    with _VERIFIED_TOKENS_LOCK:
+        entry = _VERIFIED_TOKENS.get(cache_key)
+        if entry is not None:
+            _VERIFIED_TOKENS.move_to_end(cache_key)
+
+    if entry is not None:
+        decoded = entry[1]
+        exp = decoded.get("exp")
+        if verify_time and exp is not None and exp <= time.time():
+            with _VERIFIED_TOKENS_LOCK:
+                _VERIFIED_TOKENS.pop(cache_key, None)
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        return decoded
+
+    # Audience is only checked when one is expected
+    decoded = jwt.decode(
+        auth_token,
+        key,
+        algorithms=[algorithm],
+        audience=expected_audience or None,
+        options=_DECODE_OPTIONS[(verify_time, bool(expected_audience))],
+    )
+
+    with _VERIFIED_TOKENS_LOCK:
+        _VERIFIED_TOKENS[cache_key] = (key, decoded)
+        if len(_VERIFIED_TOKENS) > _VERIFIED_TOKENS_MAXSIZE:
+            _VERIFIED_TOKENS.popitem(last=False)
+    return decoded
+
+
+def verify_mandate(
+    mandate: dict,
+    public_key: PublicKeyLike,
+    algorithm: str = "ES256K",
+    expected_audience: Optional[str] = None,
+    verify_time: bool = True,
+    hash_field_name: str = "content_hash",
+) -> Optional[str]:
+    """Verify a mandate and return its content hash.
+
+    Same checks as validate_mandate, but hands back the hash it verified so
+    callers chaining mandates (cart_hash -> pmt_hash -> cred_hash) do not have
+    to hash the contents a second time.
+
+    Args:
+        mandate: Dict with structure {"contents": dict, "auth": str}.
+        public_key: JWS verification key in PEM format or as a parsed key object.
+        algorithm: Expected JWT algorithm (default: ES256K).
+        expected_audience: Expected audience ('aud') claim for verification.
+        verify_time: Whether to verify JWT time claims (exp, iat, nbf).
+        hash_field_name: Name of hash field in JWT payload (default: "content_hash").
+
+    Returns:
+        The verified content hash, or None if verification fails.
+    """
+    try:
+        # Extract components
+        contents = mandate.get("contents")
+        auth_token = mandate.get("auth")
+
+        if contents is None or auth_token is None:
+            return None
+        if len(auth_token) > _MAX_JWS_LENGTH:
+            return None
+
+        # Verify JWT signature
+        decoded = _decode_verified(
+            auth_token, public_key, algorithm, expected_audience, verify_time
+        )
+
+        # Verify content hash (flexible field name)
+        if hash_field_name not in decoded:
+            return None
+
+        expected_hash = compute_hash(contents)
+        if decoded[hash_field_name] != expected_hash:
+            return None
+        return expected_hash
+
+    except (jwt.InvalidTokenError, jwt.DecodeError, Exception):
+        return None
+
+
 def validate_mandate(
     mandate: dict,
-    public_key: str,
+    public_key: PublicKeyLike,
     algorithm: str = "ES256K",
     expected_audience: Optional[str] = None,
     verify_time: bool = True,
@@ -152,7 +371,7 @@ def validate_mandate(
 
     Args:
         mandate: Dict with structure {"contents": dict, "auth": str}.
-        public_key: JWS verification key in PEM format.
+        public_key: JWS verification key in PEM format or as a parsed key object.
         algorithm: Expected JWT algorithm (default: ES256K).
         expected_audience: Expected audience ('aud') claim for verification.
         verify_time: Whether to verify JWT time claims (exp, iat, nbf).
@@ -174,50 +393,29 @@ def validate_mandate(
         ...     # Process mandate
         ...     process(mandate["contents"])
     """
-    try:
-        # Extract components
-        contents = mandate.get("contents")
-        auth_token = mandate.get("auth")
-
-        if contents is None or auth_token is None:
-            return False
-
-        # Prepare decode options
-        options = {"verify_exp": verify_time}
-        if not verify_time:
-            options.update(
-                {
-                    "verify_iat": False,
-                    "verify_nbf": False,
-                }
-            )
-
-        decode_kwargs = {"algorithms": [algorithm], "options": options}
-
-        # Add audience verification if provided
-        if expected_audience:
-            decode_kwargs["audience"] = expected_audience
-        else:
-            options["verify_aud"] = False
-
-        # Verify JWT signature
-        decoded = jwt.decode(auth_token, public_key, **decode_kwargs)
-
-        # Verify content hash (flexible field name)
-        if hash_field_name not in decoded:
-            return False
-
-        expected_hash = compute_hash(contents)
-        return decoded[hash_field_name] == expected_hash
-
-    except (jwt.InvalidTokenError, jwt.DecodeError, Exception):
-        return False
+    return (
+        verify_mandate(
+            mandate,
+            public_key,
+            algorithm=algorithm,
+            expected_audience=expected_audience,
+            verify_time=verify_time,
+            hash_field_name=hash_field_name,
+        )
+        is not None
+    )
 
 
 __all__ = [
+    "PrivateKeyLike",
+    "PublicKeyLike",
+    "load_private_key",
+    "load_public_key",
     "jcs_canonicalize",
     "b64url_no_pad",
     "compute_hash",
+    "compute_hash_bytes",
     "build_mandate",
+    "verify_mandate",
     "validate_mandate",
 ]
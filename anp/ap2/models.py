@@ -4,12 +4,43 @@ This module defines Pydantic models for AP2 protocol entities,
 including CartMandate, PaymentMandate, and related structures.
 """
 
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") of the last formatted current time;
+# replaced as a whole so concurrent readers never see a torn pair
+_ISO_SECOND_CACHE = (-1, "")
+
+
+def _utc_now_iso(offset_seconds: float = 0.0) -> str:
+    """Return the current UTC time (plus an optional offset) in ISO 8601 format.
+
+    Used by the timestamp default factories. Output matches
+    ``datetime.isoformat()`` for an aware UTC datetime, except that the
+    microseconds are always present. The date/time prefix is formatted once
+    per second instead of building a datetime on every call.
+    """
+    global _ISO_SECOND_CACHE
+
+    seconds, nanos = divmod(
+        time.time_ns() + int(offset_seconds * 1_000_000_000), 1_000_000_000
+    )
+    cached_second, prefix = _ISO_SECOND_CACHE
+    if seconds != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        if not offset_seconds:
+            _ISO_SECOND_CACHE = (seconds, prefix)
+    return "%s.%06d+00:00" % (prefix, nanos // 1000)
+
+
+def _new_id() -> str:
+    """Return a random UUID4 as 32 hex digits (skips the dashed str() form)."""
+    return uuid.uuid4().hex
 
 
 class PaymentProvider(str, Enum):
@@ -85,9 +116,7 @@ class QRCodePaymentData(BaseModel):
     qr_url: str = Field(..., description="QR code URL")
     out_trade_no: str = Field(..., description="External trade number")
     expires_at: str = Field(
-        default_factory=lambda: (
-            datetime.now(timezone.utc) + timedelta(minutes=5)
-        ).isoformat(),
+        default_factory=lambda: _utc_now_iso(300),
         description="Expiration time in ISO 8601 format",
     )
 
@@ -131,7 +160,7 @@ class CartContents(BaseModel):
         ..., description="Whether user signature is required"
     )
     timestamp: str = Field(
-        default_factory=lambda: datetime.now(timezone.utc).isoformat(),
+        default_factory=_utc_now_iso,
         description="Timestamp in ISO 8601 format",
     )
     payment_request: PaymentRequest = Field(..., description="Payment request")
@@ -145,6 +174,18 @@ class CartMandate(BaseModel):
         ..., description="Merchant authorization signature (JWS format)"
     )
 
+    _cart_hash: Optional[str] = PrivateAttr(default=None)
+
+    @property
+    def cart_hash(self) -> Optional[str]:
+        """The cart_hash signed at build time, or None if not built locally.
+
+        Set by build_cart_mandate so the issuing merchant can store the hash
+        without canonicalizing the contents again. Mandates parsed from the
+        wire carry no cached hash; receivers must use verify_cart_mandate.
+        """
+        return self._cart_hash
+
 
 class PaymentResponseDetails(BaseModel):
     """Payment response detail payload."""
@@ -190,7 +231,7 @@ class PaymentMandateContents(BaseModel):
     payment_response: PaymentResponse = Field(..., description="Payment response")
     merchant_agent: str = Field(..., description="Merchant agent identifier")
     timestamp: str = Field(
-        default_factory=lambda: datetime.now(timezone.utc).isoformat(),
+        default_factory=_utc_now_iso,
         description="Timestamp in ISO 8601 format",
     )
     cart_hash: str = Field(
@@ -214,6 +255,18 @@ class PaymentMandate(BaseModel):
         """Returns the payment mandate's unique identifier."""
         return self.payment_mandate_contents.get("payment_mandate_id", "")
 
+    _pmt_hash: Optional[str] = PrivateAttr(default=None)
+
+    @property
+    def pmt_hash(self) -> Optional[str]:
+        """The pmt_hash signed at build time, or None if not built locally.
+
+        Set by build_payment_mandate so the shopper can track the hash chain
+        without canonicalizing the contents again. Mandates parsed from the
+        wire carry no cached hash; receivers must use verify_payment_mandate.
+        """
+        return self._pmt_hash
+
 
 class CartMandateRequestData(BaseModel):
     """Data for initiating a CartMandate request from TA to MA."""
@@ -255,11 +308,9 @@ class PaymentReceiptContents(BaseModel):
         default="PaymentReceipt", description="Credential type"
     )
     version: int = Field(default=1, description="Credential version")
-    id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), description="Credential unique ID"
-    )
+    id: str = Field(default_factory=_new_id, description="Credential unique ID")
     timestamp: str = Field(
-        default_factory=lambda: datetime.now(timezone.utc).isoformat(),
+        default_factory=_utc_now_iso,
         description="Credential issuance time in ISO-8601 format",
     )
     payment_mandate_id: str = Field(..., description="Payment mandate ID")
@@ -302,6 +353,13 @@ class PaymentReceipt(BaseModel):
         ..., description="Merchant authorization signature (JWS)"
     )
 
+    _cred_hash: Optional[str] = PrivateAttr(default=None)
+
+    @property
+    def cred_hash(self) -> Optional[str]:
+        """The cred_hash signed at build time, or None if not built locally."""
+        return self._cred_hash
+
 
 class ShippingInfo(BaseModel):
     """Shipping information model."""
@@ -320,11 +378,9 @@ class FulfillmentReceiptContents(BaseModel):
         default="FulfillmentReceipt", description="Credential type"
     )
     version: int = Field(default=1, description="Credential version")
-    id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), description="Credential unique ID"
-    )
+    id: str = Field(default_factory=_new_id, description="Credential unique ID")
     timestamp: str = Field(
-        default_factory=lambda: datetime.now(timezone.utc).isoformat(),
+        default_factory=_utc_now_iso,
         description="Credential issuance time in ISO-8601 format",
     )
     order_id: str = Field(..., description="Order ID")
@@ -368,6 +424,13 @@ class FulfillmentReceipt(BaseModel):
         ..., description="Merchant authorization signature (JWS)"
     )
 
+    _cred_hash: Optional[str] = PrivateAttr(default=None)
+
+    @property
+    def cred_hash(self) -> Optional[str]:
+        """The cred_hash signed at build time, or None if not built locally."""
+        return self._cred_hash
+
 
 Credential = PaymentReceipt | FulfillmentReceipt
 
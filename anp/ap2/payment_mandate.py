@@ -1,6 +1,14 @@
 """PaymentMandate utilities."""
 
-from anp.ap2.mandate import build_mandate, validate_mandate
+from typing import Optional
+
+from anp.ap2.mandate import (
+    PrivateKeyLike,
+    PublicKeyLike,
+    _jws_headers,
+    build_mandate,
+    verify_mandate,
+)
 from anp.ap2.models import PaymentMandate
 
 
@@ -9,7 +17,7 @@ def build_payment_mandate(
     merchant_did: str,
     shopper_did: str,
     shopper_kid: str,
-    shopper_private_key: str,
+    shopper_private_key: PrivateKeyLike,
     algorithm: str = "ES256K",
     ttl_seconds: int = 15552000,
 ) -> PaymentMandate:
@@ -24,7 +32,7 @@ def build_payment_mandate(
         merchant_did: Merchant's DID (issuer and subject).
         shopper_did: Shopper's DID (audience).
         shopper_kid: Shopper's key ID for JWT header.
-        shopper_private_key: Shopper's private key in PEM format.
+        shopper_private_key: Shopper's private key (PEM or parsed key object).
         merchant_did: Merchant's DID (audience).
         algorithm: JWT algorithm (default: ES256K).
         ttl_seconds: Time-to-live in seconds (default: 15552000 = 180 days).
@@ -53,11 +61,7 @@ def build_payment_mandate(
         raise ValueError("contents['cart_hash'] must be set to maintain the hash chain")
 
     # Prepare headers
-    headers = {
-        "alg": algorithm,
-        "kid": shopper_kid,
-        "typ": "JWT",
-    }
+    headers = _jws_headers(algorithm, shopper_kid)
 
     # Use core build_mandate function with PaymentMandate-specific hash field name
     mandate_dict = build_mandate(
@@ -73,35 +77,38 @@ def build_payment_mandate(
     )
 
     # Convert to PaymentMandate model using Pydantic helper
-    return PaymentMandate.model_validate(
+    payment_mandate = PaymentMandate.model_validate(
         {
             "payment_mandate_contents": mandate_dict["contents"],
             "user_authorization": mandate_dict["auth"],
         }
     )
+    payment_mandate._pmt_hash = mandate_dict["pmt_hash"]
+    return payment_mandate
 
 
-def validate_payment_mandate(
+def verify_payment_mandate(
     payment_mandate: PaymentMandate,
-    shopper_public_key: str,
+    shopper_public_key: PublicKeyLike,
     shopper_algorithm: str,
     expected_merchant_did: str,
     expected_cart_hash: str,
-) -> bool:
-    """Validate PaymentMandate and verify hash chain.
+) -> Optional[str]:
+    """Verify PaymentMandate and hash chain, returning its pmt_hash.
 
-    Pure function that wraps the core validate_mandate with PaymentMandate-specific
-    configuration (expects "pmt_hash" field name) and verifies hash chain integrity.
+    Performs the same checks as validate_payment_mandate but returns the
+    verified pmt_hash, so the receiver can link receipts to it without
+    hashing the contents again.
 
     Args:
-        payment_mandate: PaymentMandate instance to validate.
-        shopper_public_key: Shopper's public key for verification.
+        payment_mandate: PaymentMandate instance to verify.
+        shopper_public_key: Shopper's public key (PEM or parsed key object).
         shopper_algorithm: JWT algorithm (e.g., ES256K).
         expected_merchant_did: DID of the merchant (expected audience).
         expected_cart_hash: Expected cart_hash from validated CartMandate.
 
     Returns:
-        True if the PaymentMandate is valid, False otherwise.
+        The verified pmt_hash, or None if the PaymentMandate is invalid.
     """
 
     # Support both Pydantic model and dict
@@ -118,20 +125,57 @@ def validate_payment_mandate(
         }
         cart_hash_in_pmt = payment_mandate.payment_mandate_contents.get("cart_hash")
 
-    if not validate_mandate(
+    # Reject a broken hash chain before paying for signature verification;
+    # cart_hash is covered by pmt_hash, which verify_mandate checks next.
+    if cart_hash_in_pmt != expected_cart_hash:
+        return None
+
+    return verify_mandate(
         mandate=mandate_dict,
         public_key=shopper_public_key,
         algorithm=shopper_algorithm,
         expected_audience=expected_merchant_did,
         verify_time=True,
         hash_field_name="pmt_hash",
-    ):
-        return False
+    )
+
 
-    return cart_hash_in_pmt == expected_cart_hash
+def validate_payment_mandate(
+    payment_mandate: PaymentMandate,
+    shopper_public_key: PublicKeyLike,
+    shopper_algorithm: str,
+    expected_merchant_did: str,
+    expected_cart_hash: str,
+) -> bool:
+    """Validate PaymentMandate and verify hash chain.
+
+    Pure function that wraps the core validate_mandate with PaymentMandate-specific
+    configuration (expects "pmt_hash" field name) and verifies hash chain integrity.
+
+    Args:
+        payment_mandate: PaymentMandate instance to validate.
+        shopper_public_key: Shopper's public key (PEM or parsed key object).
+        shopper_algorithm: JWT algorithm (e.g., ES256K).
+        expected_merchant_did: DID of the merchant (expected audience).
+        expected_cart_hash: Expected cart_hash from validated CartMandate.
+
+    Returns:
+        True if the PaymentMandate is valid, False otherwise.
+    """
+    return (
+        verify_payment_mandate(
+            payment_mandate=payment_mandate,
+            shopper_public_key=shopper_public_key,
+            shopper_algorithm=shopper_algorithm,
+            expected_merchant_did=expected_merchant_did,
+            expected_cart_hash=expected_cart_hash,
+        )
+        is not None
+    )
 
 
 __all__ = [
     "build_payment_mandate",
+    "verify_payment_mandate",
     "validate_payment_mandate",
 ]
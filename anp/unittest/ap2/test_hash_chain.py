@@ -8,12 +8,25 @@ This module tests the hash chain integrity verification:
 - credential hash verification (pmt_hash in receipts)
 """
 
+import asyncio
 import unittest
 from pathlib import Path
-
-from anp.ap2.cart_mandate import build_cart_mandate, validate_cart_mandate
+from unittest import mock
+
+from anp.ap2.cart_mandate import (
+    build_cart_mandate,
+    build_cart_mandates,
+    validate_cart_mandate,
+    validate_cart_mandate_async,
+    verify_cart_mandate,
+)
 from anp.ap2.mandate import compute_hash
-from anp.ap2.payment_mandate import build_payment_mandate, validate_payment_mandate
+from anp.ap2.models import CartMandate, PaymentMandate
+from anp.ap2.payment_mandate import (
+    build_payment_mandate,
+    validate_payment_mandate,
+    verify_payment_mandate,
+)
 
 
 class TestCartHashComputation(unittest.TestCase):
@@ -84,6 +97,77 @@ class TestCartHashComputation(unittest.TestCase):
         expected_hash = compute_hash(contents)
         self.assertEqual(payload["cart_hash"], expected_hash)
 
+    def test_verify_cart_mandate_returns_cart_hash(self):
+        """测试 verify_cart_mandate 返回已验证的 cart_hash"""
+        contents = {"id": "cart-123", "total": 100}
+
+        cart_mandate = build_cart_mandate(
+            contents=contents,
+            merchant_private_key=self.private_key,
+            merchant_did="did:wba:merchant",
+            merchant_kid="key-1",
+            shopper_did="did:wba:shopper",
+            algorithm="ES256K",
+        )
+
+        cart_hash = verify_cart_mandate(
+            cart_mandate=cart_mandate,
+            merchant_public_key=self.public_key,
+            merchant_algorithm="ES256K",
+            expected_shopper_did="did:wba:shopper",
+        )
+        self.assertEqual(cart_hash, compute_hash(contents))
+
+        # 错误的 audience 返回 None
+        self.assertIsNone(
+            verify_cart_mandate(
+                cart_mandate=cart_mandate,
+                merchant_public_key=self.public_key,
+                merchant_algorithm="ES256K",
+                expected_shopper_did="did:wba:other",
+            )
+        )
+
+    def test_built_cart_mandate_caches_cart_hash(self):
+        """测试本地构建的 CartMandate 缓存 cart_hash，反序列化后不携带"""
+        contents = {"id": "cart-cached", "total": 100}
+
+        cart_mandate = build_cart_mandate(
+            contents=contents,
+            merchant_private_key=self.private_key,
+            merchant_did="did:wba:merchant",
+            merchant_kid="key-1",
+            shopper_did="did:wba:shopper",
+            algorithm="ES256K",
+        )
+        self.assertEqual(cart_mandate.cart_hash, compute_hash(contents))
+        self.assertNotIn("cart_hash", cart_mandate.model_dump())
+
+        received = CartMandate.model_validate(cart_mandate.model_dump())
+        self.assertIsNone(received.cart_hash)
+
+    def test_validate_cart_mandate_async(self):
+        """测试在线程中异步验证 CartMandate"""
+        cart_mandate = build_cart_mandate(
+            contents={"id": "cart-async"},
+            merchant_private_key=self.private_key,
+            merchant_did="did:wba:merchant",
+            merchant_kid="key-1",
+            shopper_did="did:wba:shopper",
+            algorithm="ES256K",
+        )
+
+        self.assertTrue(
+            asyncio.run(
+                validate_cart_mandate_async(
+                    cart_mandate=cart_mandate,
+                    merchant_public_key=self.public_key,
+                    merchant_algorithm="ES256K",
+                    expected_shopper_did="did:wba:shopper",
+                )
+            )
+        )
+
     def test_cart_hash_changes_with_content(self):
         """测试不同内容产生不同的 cart hash"""
         contents1 = {"id": "cart-1", "total": 100}
@@ -110,6 +194,33 @@ class TestCartHashComputation(unittest.TestCase):
 
         self.assertNotEqual(hash1, hash2)
 
+    def test_build_cart_mandates_batch(self):
+        """测试批量签名 CartMandate"""
+        orders = [
+            ({"id": "cart-1", "total": 100}, "did:wba:shopper-1"),
+            ({"id": "cart-2", "total": 200}, "did:wba:shopper-2"),
+        ]
+
+        carts = build_cart_mandates(
+            orders,
+            merchant_private_key=self.private_key,
+            merchant_did="did:wba:merchant",
+            merchant_kid="key-1",
+        )
+
+        self.assertEqual(len(carts), 2)
+        for cart, (contents, shopper_did) in zip(carts, orders):
+            self.assertEqual(cart.contents, contents)
+            self.assertEqual(cart.cart_hash, compute_hash(contents))
+            self.assertTrue(
+                validate_cart_mandate(
+                    cart_mandate=cart,
+                    merchant_public_key=self.public_key,
+                    merchant_algorithm="ES256K",
+                    expected_shopper_did=shopper_did,
+                )
+            )
+
 
 class TestPaymentHashComputation(unittest.TestCase):
     """测试 PaymentMandate 哈希计算"""
@@ -189,6 +300,24 @@ class TestPaymentHashComputation(unittest.TestCase):
         expected_hash = compute_hash(contents)
         self.assertEqual(payload["pmt_hash"], expected_hash)
 
+    def test_built_payment_mandate_caches_pmt_hash(self):
+        """测试本地构建的 PaymentMandate 缓存 pmt_hash，反序列化后不携带"""
+        contents = {"payment_mandate_id": "pm-cached", "cart_hash": "dummy_cart_hash"}
+
+        payment_mandate = build_payment_mandate(
+            contents=contents,
+            shopper_private_key=self.private_key,
+            shopper_did="did:wba:shopper",
+            shopper_kid="key-1",
+            merchant_did="did:wba:merchant",
+            algorithm="ES256K",
+        )
+        self.assertEqual(payment_mandate.pmt_hash, compute_hash(contents))
+        self.assertNotIn("pmt_hash", payment_mandate.model_dump())
+
+        received = PaymentMandate.model_validate(payment_mandate.model_dump())
+        self.assertIsNone(received.pmt_hash)
+
 
 class TestHashChainIntegrity(unittest.TestCase):
     """测试 cart_hash → pmt_hash 哈希链完整性"""
@@ -261,6 +390,29 @@ class TestHashChainIntegrity(unittest.TestCase):
 
         self.assertTrue(is_valid)
 
+        # 4. verify_payment_mandate 直接返回已验证的 pmt_hash
+        pmt_hash = verify_payment_mandate(
+            payment_mandate=payment_mandate,
+            shopper_public_key=self.public_key,
+            shopper_algorithm="ES256K",
+            expected_merchant_did="did:wba:merchant",
+            expected_cart_hash=cart_hash,
+        )
+        self.assertEqual(pmt_hash, compute_hash(payment_mandate.payment_mandate_contents))
+
+        # 哈希链不匹配时直接拒绝, 不进行签名验证
+        with mock.patch("anp.ap2.payment_mandate.verify_mandate") as verify:
+            self.assertIsNone(
+                verify_payment_mandate(
+                    payment_mandate=payment_mandate,
+                    shopper_public_key=self.public_key,
+                    shopper_algorithm="ES256K",
+                    expected_merchant_did="did:wba:merchant",
+                    expected_cart_hash="wrong-cart-hash",
+                )
+            )
+        verify.assert_not_called()
+
     def test_hash_chain_tampered_cart(self):
         """测试篡改的 cart 会破坏 hash chain"""
         # 1. 创建 CartMandate
@@ -508,6 +660,250 @@ class TestCredentialHashVerification(unittest.TestCase):
         # 3. 验证 receipt contents 包含正确的 pmt_hash
         self.assertEqual(receipt.contents["pmt_hash"], pmt_hash)
 
+    def test_receipt_builder_overrides_pmt_hash(self):
+        """测试构建 receipt 时以传入的 pmt_hash 为准，且不修改原 contents"""
+        from anp.ap2.credential_mandate import build_fulfillment_receipt
+        from anp.ap2.models import DisplayItem, FulfillmentReceiptContents, MoneyAmount
+
+        fulfillment_contents = FulfillmentReceiptContents(
+            order_id="order-123",
+            items=[DisplayItem(id="item-1", label="Item 1", quantity=1, amount=MoneyAmount(currency="CNY", value=100))],
+            fulfilled_at="2025-01-01T00:00:00Z",
+            pmt_hash="placeholder",
+        )
+
+        receipt = build_fulfillment_receipt(
+            contents=fulfillment_contents,
+            pmt_hash="pmt-hash-123",
+            merchant_private_key=self.private_key,
+            merchant_did="did:wba:merchant",
+            merchant_kid="merchant-key-1",
+            shopper_did="did:wba:shopper",
+            algorithm="ES256K",
+        )
+
+        self.assertEqual(receipt.contents["pmt_hash"], "pmt-hash-123")
+        self.assertEqual(fulfillment_contents.pmt_hash, "placeholder")
+        import jwt
+        payload = jwt.decode(
+            receipt.merchant_authorization, options={"verify_signature": False}
+        )
+        self.assertEqual(payload["cred_hash"], compute_hash(receipt.contents))
+
+    def test_build_fulfillment_receipts_batch(self):
+        """测试批量签名 FulfillmentReceipt"""
+        from anp.ap2.credential_mandate import build_fulfillment_receipts, validate_credential
+        from anp.ap2.models import DisplayItem, FulfillmentReceiptContents, MoneyAmount
+
+        item = DisplayItem(id="item-1", label="Item 1", quantity=1, amount=MoneyAmount(currency="CNY", value=100))
+        receipts = [
+            (
+                FulfillmentReceiptContents(
+                    order_id=f"order-{i}",
+                    items=[item],
+                    fulfilled_at="2025-01-01T00:00:00Z",
+                    pmt_hash="placeholder",
+                ),
+                f"pmt-hash-{i}",
+                f"did:wba:shopper-{i}",
+            )
+            for i in range(2)
+        ]
+
+        built = build_fulfillment_receipts(
+            receipts,
+            merchant_did="did:wba:merchant",
+            merchant_kid="merchant-key-1",
+            merchant_private_key=self.private_key,
+        )
+
+        self.assertEqual(len(built), 2)
+        for receipt, (contents, pmt_hash, shopper_did) in zip(built, receipts):
+            self.assertEqual(receipt.contents["order_id"], contents.order_id)
+            self.assertTrue(
+                validate_credential(
+                    receipt,
+                    expected_shopper_did=shopper_did,
+                    merchant_public_key=self.public_key,
+                    merchant_algorithm="ES256K",
+                    expected_pmt_hash=pmt_hash,
+                )
+            )
+
+    def test_validate_payment_receipt(self):
+        """测试 PaymentReceipt 验证 (类型、签名与 pmt_hash)"""
+        from anp.ap2.credential_mandate import build_payment_receipt, validate_credential
+        from anp.ap2.models import MoneyAmount, PaymentProvider, PaymentReceiptContents, PaymentStatus
+
+        receipt_contents = PaymentReceiptContents(
+            payment_mandate_id="pm-123",
+            provider=PaymentProvider.ALIPAY,
+            status=PaymentStatus.SUCCEEDED,
+            transaction_id="txn-123",
+            out_trade_no="order-123",
+            paid_at="2025-01-01T00:00:00Z",
+            amount=MoneyAmount(currency="CNY", value=100),
+            pmt_hash="pmt-hash-123",
+        )
+
+        receipt = build_payment_receipt(
+            contents=receipt_contents,
+            pmt_hash="pmt-hash-123",
+            merchant_private_key=self.private_key,
+            merchant_did="did:wba:merchant",
+            merchant_kid="merchant-key-1",
+            shopper_did="did:wba:shopper",
+            algorithm="ES256K",
+        )
+
+        kwargs = {
+            "expected_shopper_did": "did:wba:shopper",
+            "merchant_public_key": self.public_key,
+            "merchant_algorithm": "ES256K",
+        }
+        self.assertTrue(
+            validate_credential(receipt, expected_pmt_hash="pmt-hash-123", **kwargs)
+        )
+        # 哈希链不匹配时不应进行签名验证
+        with mock.patch("anp.ap2.credential_mandate.verify_mandate") as verify:
+            self.assertFalse(
+                validate_credential(receipt, expected_pmt_hash="other-hash", **kwargs)
+            )
+        verify.assert_not_called()
+
+        # verify_credential 返回已验证的 cred_hash，与构建时缓存的一致
+        from anp.ap2.credential_mandate import verify_credential
+
+        self.assertEqual(receipt.cred_hash, compute_hash(receipt.contents))
+        self.assertEqual(
+            verify_credential(receipt, expected_pmt_hash="pmt-hash-123", **kwargs),
+            receipt.cred_hash,
+        )
+        self.assertIsNone(
+            verify_credential(receipt, expected_pmt_hash="other-hash", **kwargs)
+        )
+
+        # 异步版本：哈希链不匹配时直接拒绝，不切换到工作线程
+        from anp.ap2.credential_mandate import validate_credential_async
+
+        self.assertTrue(
+            asyncio.run(
+                validate_credential_async(
+                    receipt, expected_pmt_hash="pmt-hash-123", **kwargs
+                )
+            )
+        )
+        with mock.patch("anp.ap2.credential_mandate.asyncio.to_thread") as to_thread:
+            self.assertFalse(
+                asyncio.run(
+                    validate_credential_async(
+                        receipt, expected_pmt_hash="other-hash", **kwargs
+                    )
+                )
+            )
+        to_thread.assert_not_called()
+
+    def test_revalidating_receipt_verifies_signature_once(self):
+        """测试重复验证同一 PaymentReceipt 只做一次签名验证"""
+        from anp.ap2 import mandate as mandate_module
+        from anp.ap2.credential_mandate import build_payment_receipt, validate_credential
+        from anp.ap2.models import MoneyAmount, PaymentProvider, PaymentReceiptContents, PaymentStatus
+
+        receipt = build_payment_receipt(
+            contents=PaymentReceiptContents(
+                payment_mandate_id="pm-audit",
+                provider=PaymentProvider.ALIPAY,
+                status=PaymentStatus.SUCCEEDED,
+                transaction_id="txn-audit",
+                out_trade_no="order-audit",
+                paid_at="2025-01-01T00:00:00Z",
+                amount=MoneyAmount(currency="CNY", value=100),
+                pmt_hash="pmt-hash-audit",
+            ),
+            pmt_hash="pmt-hash-audit",
+            merchant_private_key=self.private_key,
+            merchant_did="did:wba:merchant",
+            merchant_kid="merchant-key-1",
+            shopper_did="did:wba:shopper",
+            algorithm="ES256K",
+        )
+
+        with mock.patch.object(
+            mandate_module.jwt, "decode", wraps=mandate_module.jwt.decode
+        ) as decode:
+            for _ in range(3):
+                self.assertTrue(
+                    validate_credential(
+                        receipt,
+                        expected_shopper_did="did:wba:shopper",
+                        merchant_public_key=self.public_key,
+                        merchant_algorithm="ES256K",
+                        expected_pmt_hash="pmt-hash-audit",
+                    )
+                )
+
+        self.assertEqual(decode.call_count, 1)
+
+    def test_validate_payment_receipt_subclass(self):
+        """测试 PaymentReceipt 子类按父类的 credential_type 验证"""
+        from anp.ap2.credential_mandate import build_payment_receipt, verify_credential
+        from anp.ap2.models import (
+            MoneyAmount,
+            PaymentProvider,
+            PaymentReceipt,
+            PaymentReceiptContents,
+            PaymentStatus,
+        )
+
+        class AuditedPaymentReceipt(PaymentReceipt):
+            pass
+
+        receipt = build_payment_receipt(
+            contents=PaymentReceiptContents(
+                payment_mandate_id="pm-sub",
+                provider=PaymentProvider.ALIPAY,
+                status=PaymentStatus.SUCCEEDED,
+                transaction_id="txn-sub",
+                out_trade_no="order-sub",
+                paid_at="2025-01-01T00:00:00Z",
+                amount=MoneyAmount(currency="CNY", value=100),
+                pmt_hash="pmt-hash-sub",
+            ),
+            pmt_hash="pmt-hash-sub",
+            merchant_private_key=self.private_key,
+            merchant_did="did:wba:merchant",
+            merchant_kid="merchant-key-1",
+            shopper_did="did:wba:shopper",
+            algorithm="ES256K",
+        )
+        subclassed = AuditedPaymentReceipt.model_validate(receipt.model_dump())
+
+        self.assertEqual(
+            verify_credential(
+                subclassed,
+                expected_shopper_did="did:wba:shopper",
+                merchant_public_key=self.public_key,
+                merchant_algorithm="ES256K",
+                expected_pmt_hash="pmt-hash-sub",
+            ),
+            receipt.cred_hash,
+        )
+
+    def test_validate_unsupported_credential_type(self):
+        """测试不支持的凭证类型抛出 TypeError"""
+        from anp.ap2.credential_mandate import validate_credential
+
+        with self.assertRaises(TypeError) as context:
+            validate_credential(
+                CartMandate(contents={}, merchant_authorization="jws"),
+                expected_shopper_did="did:wba:shopper",
+                merchant_public_key=self.public_key,
+                merchant_algorithm="ES256K",
+                expected_pmt_hash="pmt-hash-123",
+            )
+
+        self.assertIn("CartMandate", str(context.exception))
+
 
 if __name__ == "__main__":
     unittest.main()
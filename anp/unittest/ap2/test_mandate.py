@@ -12,12 +12,20 @@ import time
 import unittest
 import uuid
 from pathlib import Path
+from unittest import mock
 
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from anp.ap2 import mandate as mandate_module
 from anp.ap2.mandate import (
     b64url_no_pad,
     build_mandate,
     compute_hash,
+    compute_hash_bytes,
     jcs_canonicalize,
+    load_private_key,
+    load_public_key,
     validate_mandate,
 )
 
@@ -77,6 +85,38 @@ class TestHashComputation(unittest.TestCase):
         # 不同的内容应该产生不同的哈希
         self.assertNotEqual(hash1, hash2)
 
+    def test_compute_hash_bytes_matches_compute_hash(self):
+        """测试对规范化字节直接哈希与 compute_hash 一致"""
+        contents = {"b": [1, 2], "a": "值"}
+        canonical = jcs_canonicalize(contents).encode("utf-8")
+        self.assertEqual(compute_hash_bytes(canonical), compute_hash(contents))
+
+    def test_model_dump_json_is_not_canonical(self):
+        """测试 model_dump_json 输出不是 JCS, 不能直接用于哈希"""
+        from anp.ap2.models import DisplayItem, MoneyAmount
+
+        item = DisplayItem(
+            id="item-1",
+            label="Item",
+            quantity=1,
+            amount=MoneyAmount(currency="CNY", value=10),
+        )
+        raw = item.model_dump_json(exclude_none=True).encode("utf-8")
+        self.assertNotEqual(
+            compute_hash_bytes(raw), compute_hash(item.model_dump(exclude_none=True))
+        )
+
+    def test_compute_hash_known_answer(self):
+        """测试哈希输出与固定向量一致 (跨 SDK 互通)"""
+        contents = {
+            "id": "cart-123",
+            "total": {"currency": "CNY", "value": 100},
+            "label": "测试",
+        }
+        self.assertEqual(
+            compute_hash(contents), "u7t56pd_pIg0wYTmtnBgrnwIVzHrqsfiEW9UxOO9cP4"
+        )
+
     def test_b64url_no_pad(self):
         """测试 Base64URL 编码无填充"""
         data = b"test data"
@@ -143,6 +183,9 @@ class TestBuildMandate(unittest.TestCase):
         payload = jwt.decode(mandate["auth"], options={"verify_signature": False})
         self.assertIn("cart_hash", payload)
         self.assertNotIn("content_hash", payload)
+        # 返回值中回显已签名的哈希，无需再次计算
+        self.assertEqual(mandate["cart_hash"], payload["cart_hash"])
+        self.assertEqual(mandate["cart_hash"], compute_hash(contents))
 
     def test_build_mandate_jwt_claims(self):
         """测试 JWT claims 正确设置"""
@@ -173,6 +216,26 @@ class TestBuildMandate(unittest.TestCase):
         # exp 应该是 iat + ttl_seconds
         self.assertEqual(payload["exp"], payload["iat"] + 900)
 
+    def test_build_mandate_issued_at(self):
+        """测试可以指定 iat（批量签名共享同一时间戳）"""
+        import jwt
+
+        issued_at = int(time.time()) - 10
+        mandate = build_mandate(
+            contents={"id": "test"},
+            headers={"alg": "ES256K", "kid": "key-1", "typ": "JWT"},
+            iss="did:wba:issuer",
+            sub="did:wba:subject",
+            aud="did:wba:audience",
+            private_key=self.private_key,
+            algorithm="ES256K",
+            ttl_seconds=900,
+            issued_at=issued_at,
+        )
+        payload = jwt.decode(mandate["auth"], options={"verify_signature": False})
+        self.assertEqual(payload["iat"], issued_at)
+        self.assertEqual(payload["exp"], issued_at + 900)
+
 
 class TestValidateMandate(unittest.TestCase):
     """测试 mandate 验证功能"""
@@ -394,6 +457,193 @@ class TestValidateMandate(unittest.TestCase):
 
         self.assertFalse(is_valid)
 
+    def test_validate_mandate_oversized_jwt(self):
+        """测试超长 JWT 在验签前即被拒绝"""
+        mandate = {
+            "contents": {"id": "test"},
+            "auth": "a" * (mandate_module._MAX_JWS_LENGTH + 1),
+        }
+
+        with mock.patch.object(mandate_module.jwt, "decode") as decode:
+            is_valid = validate_mandate(
+                mandate=mandate,
+                public_key=self.public_key,
+                algorithm="ES256K",
+            )
+
+        self.assertFalse(is_valid)
+        decode.assert_not_called()
+
+
+class TestPackageExports(unittest.TestCase):
+    """测试 anp.ap2 包级导出"""
+
+    def test_submodules_and_helpers_are_exported(self):
+        """测试子模块属性访问和新增的 mandate 辅助函数导出"""
+        import anp.ap2 as ap2
+
+        self.assertIs(ap2.mandate, mandate_module)
+        self.assertTrue(hasattr(ap2.models, "CartMandate"))
+        for name in (
+            "compute_hash_bytes",
+            "load_private_key",
+            "load_public_key",
+            "verify_mandate",
+        ):
+            self.assertIn(name, ap2.__all__)
+            self.assertIs(getattr(ap2, name), getattr(mandate_module, name))
+
+
+class TestKeyLoading(unittest.TestCase):
+    """测试 PEM 密钥解析缓存"""
+
+    @classmethod
+    def setUpClass(cls):
+        """设置测试密钥"""
+        project_root = Path(__file__).resolve().parents[3]
+        private_key_path = project_root / "docs/did_public/public-private-key.pem"
+        cls.private_key = private_key_path.read_text(encoding="utf-8")
+
+    def test_load_private_key_is_cached(self):
+        """测试相同 PEM 只解析一次"""
+        key1 = load_private_key(self.private_key)
+        key2 = load_private_key(self.private_key.encode("utf-8"))
+        self.assertIs(key1, key2)
+
+    def test_load_public_key_is_cached(self):
+        """测试验证时相同公钥 PEM 只解析一次"""
+        public_pem = (
+            load_private_key(self.private_key)
+            .public_key()
+            .public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+        )
+        key1 = load_public_key(public_pem.decode("utf-8"))
+        key2 = load_public_key(public_pem)
+        self.assertIs(key1, key2)
+
+    def test_load_key_passes_through_objects(self):
+        """测试已解析的密钥对象原样返回"""
+        private_obj = load_private_key(self.private_key)
+        public_obj = private_obj.public_key()
+        self.assertIs(load_private_key(private_obj), private_obj)
+        self.assertIs(load_public_key(public_obj), public_obj)
+
+    def test_build_and_validate_with_key_objects(self):
+        """测试使用已解析密钥对象进行签名和验证"""
+        private_obj = load_private_key(self.private_key)
+        mandate = build_mandate(
+            contents={"id": "obj-1"},
+            headers={"alg": "ES256K", "kid": "key-1", "typ": "JWT"},
+            iss="did:wba:merchant",
+            sub="did:wba:merchant",
+            aud="did:wba:shopper",
+            private_key=private_obj,
+            algorithm="ES256K",
+        )
+        self.assertTrue(
+            validate_mandate(
+                mandate=mandate,
+                public_key=private_obj.public_key(),
+                algorithm="ES256K",
+                expected_audience="did:wba:shopper",
+            )
+        )
+
+    def test_build_and_validate_eddsa(self):
+        """测试 Ed25519 密钥的 EdDSA 签名和验证"""
+        private_obj = ed25519.Ed25519PrivateKey.generate()
+        private_pem = private_obj.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        public_pem = private_obj.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        mandate = build_mandate(
+            contents={"id": "eddsa-1"},
+            headers={"alg": "EdDSA", "kid": "key-1", "typ": "JWT"},
+            iss="did:wba:merchant",
+            sub="did:wba:merchant",
+            aud="did:wba:shopper",
+            private_key=load_private_key(private_pem),
+            algorithm="EdDSA",
+        )
+        self.assertTrue(
+            validate_mandate(
+                mandate=mandate,
+                public_key=load_public_key(public_pem),
+                algorithm="EdDSA",
+                expected_audience="did:wba:shopper",
+            )
+        )
+
+
+class TestVerifiedTokenCache(unittest.TestCase):
+    """测试已验证 JWT 的缓存"""
+
+    @classmethod
+    def setUpClass(cls):
+        """设置测试密钥"""
+        project_root = Path(__file__).resolve().parents[3]
+        private_key_path = project_root / "docs/did_public/public-private-key.pem"
+        cls.private_key = private_key_path.read_text(encoding="utf-8")
+        cls.public_key = load_private_key(cls.private_key).public_key()
+
+    def _build(self, contents):
+        return build_mandate(
+            contents=contents,
+            headers={"alg": "ES256K", "kid": "key-1", "typ": "JWT"},
+            iss="did:wba:merchant",
+            sub="did:wba:merchant",
+            aud="did:wba:shopper",
+            private_key=self.private_key,
+            algorithm="ES256K",
+            ttl_seconds=60,
+        )
+
+    def _validate(self, mandate):
+        return validate_mandate(
+            mandate=mandate,
+            public_key=self.public_key,
+            algorithm="ES256K",
+            expected_audience="did:wba:shopper",
+        )
+
+    def test_repeated_validation_verifies_once(self):
+        """测试重复验证同一 mandate 只做一次签名验证"""
+        mandate = self._build({"id": f"cache-{uuid.uuid4()}"})
+
+        with mock.patch.object(
+            mandate_module.jwt, "decode", wraps=mandate_module.jwt.decode
+        ) as decode:
+            self.assertTrue(self._validate(mandate))
+            self.assertTrue(self._validate(mandate))
+
+        self.assertEqual(decode.call_count, 1)
+
+    def test_cached_token_still_checks_contents(self):
+        """测试缓存命中时仍校验内容哈希"""
+        mandate = self._build({"id": f"cache-{uuid.uuid4()}"})
+        self.assertTrue(self._validate(mandate))
+
+        tampered = {"contents": {"id": "tampered"}, "auth": mandate["auth"]}
+        self.assertFalse(self._validate(tampered))
+
+    def test_cached_token_expires(self):
+        """测试缓存的 token 过期后验证失败"""
+        mandate = self._build({"id": f"cache-{uuid.uuid4()}"})
+        self.assertTrue(self._validate(mandate))
+
+        with mock.patch.object(
+            mandate_module.time, "time", return_value=time.time() + 120
+        ):
+            self.assertFalse(self._validate(mandate))
+
 
 if __name__ == "__main__":
     unittest.main()
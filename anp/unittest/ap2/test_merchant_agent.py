@@ -0,0 +1,213 @@
+"""AP2 Example MerchantAgent Async Wrapper Tests.
+
+This module tests the thread-offloaded async variants on the example
+MerchantAgent:
+- build_cart_mandate_response_async()
+- verify_payment_mandate_async()
+- build_payment_receipt_async() / build_fulfillment_receipt_async()
+
+It also pins the TypeError raised by build_cart_mandate_response() for
+invalid items.
+"""
+
+import asyncio
+import json
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+from anp.ap2.cart_mandate import verify_cart_mandate
+from anp.ap2.credential_mandate import verify_credential
+from anp.ap2.models import (
+    ANPMessage,
+    CartMandate,
+    DisplayItem,
+    FulfillmentReceiptContents,
+    MoneyAmount,
+    PaymentProvider,
+    PaymentReceiptContents,
+    PaymentStatus,
+)
+from anp.ap2.payment_mandate import build_payment_mandate
+from anp.authentication.verification_methods import EcdsaSecp256k1VerificationKey2019
+from examples.python.ap2_examples import merchant_agent as merchant_agent_module
+from examples.python.ap2_examples.merchant_agent import MerchantAgent
+
+MERCHANT_DID = "did:wba:merchant"
+SHOPPER_DID = "did:wba:shopper"
+
+
+class TestMerchantAgentAsync(unittest.TestCase):
+    """测试 MerchantAgent 的异步包装方法"""
+
+    @classmethod
+    def setUpClass(cls):
+        """设置测试密钥和 MerchantAgent"""
+        project_root = Path(__file__).resolve().parents[3]
+        private_key_path = project_root / "docs/did_public/public-private-key.pem"
+        cls.private_key = private_key_path.read_text(encoding="utf-8")
+
+        did_doc_path = project_root / "docs/did_public/public-did-doc.json"
+        did_doc = json.loads(did_doc_path.read_text(encoding="utf-8"))
+        verifier = EcdsaSecp256k1VerificationKey2019.from_dict(
+            did_doc["verificationMethod"][0]
+        )
+        cls.public_key = verifier.public_key.public_bytes(
+            Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+        ).decode("utf-8")
+
+        cls.agent = MerchantAgent(
+            merchant_private_key=cls.private_key,
+            merchant_did=MERCHANT_DID,
+            merchant_kid="merchant-key-1",
+        )
+
+    def _run_offloaded(self, coro_factory):
+        """运行协程并确认其通过 asyncio.to_thread 按关键字参数转发执行"""
+        with mock.patch.object(
+            merchant_agent_module.asyncio, "to_thread", wraps=asyncio.to_thread
+        ) as to_thread:
+            result = asyncio.run(coro_factory())
+        to_thread.assert_called_once()
+        # 只有目标方法按位置传递，其余参数均按关键字转发
+        self.assertEqual(len(to_thread.call_args.args), 1)
+        return result
+
+    def test_build_cart_mandate_response_async(self):
+        """测试异步构建 CartMandate 响应"""
+        item = DisplayItem(
+            id="item-1",
+            label="Item 1",
+            quantity=2,
+            amount=MoneyAmount(currency="CNY", value=50),
+        )
+        response = self._run_offloaded(
+            lambda: self.agent.build_cart_mandate_response_async(
+                order_id="order-1",
+                items=[item],
+                total_amount=MoneyAmount(currency="CNY", value=100),
+                shopper_did=SHOPPER_DID,
+                qr_url="https://pay.example.com/qr/order-1",
+                out_trade_no="trade-1",
+            )
+        )
+
+        self.assertIsInstance(response, ANPMessage)
+        self.assertEqual(response.messageId, "cart-response-order-1")
+        cart_mandate = CartMandate.model_validate(response.data)
+        self.assertIsNotNone(
+            verify_cart_mandate(
+                cart_mandate=cart_mandate,
+                merchant_public_key=self.public_key,
+                merchant_algorithm="ES256K",
+                expected_shopper_did=SHOPPER_DID,
+            )
+        )
+
+    def test_build_cart_mandate_response_invalid_items(self):
+        """测试无效商品条目抛出 TypeError"""
+        for items in ([object()], [{"id": "item-1"}]):
+            with self.subTest(items=items):
+                with self.assertRaises(TypeError):
+                    self.agent.build_cart_mandate_response(
+                        order_id="order-1",
+                        items=items,
+                        total_amount=MoneyAmount(currency="CNY", value=100),
+                        shopper_did=SHOPPER_DID,
+                    )
+
+    def test_verify_payment_mandate_async(self):
+        """测试异步验证 PaymentMandate"""
+        cart_hash = "cart-hash-123"
+        payment_mandate = build_payment_mandate(
+            contents={"payment_mandate_id": "pm-1", "cart_hash": cart_hash},
+            merchant_did=MERCHANT_DID,
+            shopper_did=SHOPPER_DID,
+            shopper_kid="shopper-key-1",
+            shopper_private_key=self.private_key,
+        )
+        request = ANPMessage(
+            messageId="payment-request-pm-1",
+            to=MERCHANT_DID,
+            data=payment_mandate.model_dump(),
+            **{"from": SHOPPER_DID},
+        )
+
+        result = self._run_offloaded(
+            lambda: self.agent.verify_payment_mandate_async(
+                request, cart_hash, self.public_key
+            )
+        )
+        expected = self.agent.verify_payment_mandate(
+            request, cart_hash, self.public_key
+        )
+        self.assertEqual(result, expected)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(
+                self.agent.verify_payment_mandate_async(
+                    request, "other-cart-hash", self.public_key
+                )
+            )
+
+    def test_build_payment_receipt_async(self):
+        """测试异步构建 PaymentReceipt"""
+        contents = PaymentReceiptContents(
+            payment_mandate_id="pm-1",
+            provider=PaymentProvider.ALIPAY,
+            status=PaymentStatus.SUCCEEDED,
+            transaction_id="txn-1",
+            out_trade_no="trade-1",
+            paid_at="2025-01-01T00:00:00Z",
+            amount=MoneyAmount(currency="CNY", value=100),
+            pmt_hash="pmt-hash-1",
+        )
+        receipt = self._run_offloaded(
+            lambda: self.agent.build_payment_receipt_async(
+                contents, "pmt-hash-1", SHOPPER_DID
+            )
+        )
+
+        self.assertEqual(
+            verify_credential(
+                receipt, SHOPPER_DID, self.public_key, "ES256K", "pmt-hash-1"
+            ),
+            receipt.cred_hash,
+        )
+
+    def test_build_fulfillment_receipt_async(self):
+        """测试异步构建 FulfillmentReceipt"""
+        contents = FulfillmentReceiptContents(
+            order_id="order-1",
+            items=[
+                DisplayItem(
+                    id="item-1",
+                    label="Item 1",
+                    quantity=1,
+                    amount=MoneyAmount(currency="CNY", value=100),
+                )
+            ],
+            fulfilled_at="2025-01-01T00:00:00Z",
+            pmt_hash="pmt-hash-1",
+        )
+        receipt = self._run_offloaded(
+            lambda: self.agent.build_fulfillment_receipt_async(
+                fulfillment_receipt_contents=contents,
+                pmt_hash="pmt-hash-1",
+                shopper_did=SHOPPER_DID,
+                ttl_seconds=600,
+            )
+        )
+
+        self.assertEqual(
+            verify_credential(
+                receipt, SHOPPER_DID, self.public_key, "ES256K", "pmt-hash-1"
+            ),
+            receipt.cred_hash,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""AP2 Model Helper Tests.
+
+This module tests the helpers behind the model default factories:
+- _utc_now_iso() - ISO 8601 timestamps used in signed and hashed contents
+"""
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from anp.ap2 import models as models_module
+from anp.ap2.models import CartContents, _utc_now_iso
+
+
+def _expected_iso(ns: int) -> str:
+    """Reference formatting for an epoch time given in nanoseconds."""
+    seconds, nanos = divmod(ns, 1_000_000_000)
+    return (
+        datetime.fromtimestamp(seconds, tz=timezone.utc)
+        .replace(microsecond=nanos // 1000)
+        .isoformat(timespec="microseconds")
+    )
+
+
+class TestUtcNowIso(unittest.TestCase):
+    """测试时间戳默认值的 ISO 8601 格式"""
+
+    # 2025-01-27T08:30:15.123456789Z
+    NOW_NS = 1_737_966_615_123_456_789
+
+    def setUp(self):
+        """每个测试前清空按秒缓存的时间前缀"""
+        patcher = mock.patch.object(models_module, "_ISO_SECOND_CACHE", (-1, ""))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _patch_time_ns(self, *values):
+        return mock.patch.object(
+            models_module.time, "time_ns", side_effect=list(values)
+        )
+
+    def test_matches_isoformat(self):
+        """测试输出与 datetime.isoformat(timespec="microseconds") 一致"""
+        with self._patch_time_ns(self.NOW_NS):
+            result = _utc_now_iso()
+        self.assertEqual(result, _expected_iso(self.NOW_NS))
+        self.assertEqual(result, "2025-01-27T08:30:15.123456+00:00")
+
+    def test_zero_microseconds_are_kept(self):
+        """测试整秒时间仍然输出微秒部分"""
+        ns = self.NOW_NS - self.NOW_NS % 1_000_000_000
+        with self._patch_time_ns(ns):
+            self.assertEqual(_utc_now_iso(), "2025-01-27T08:30:15.000000+00:00")
+
+    def test_offset_for_expires_at(self):
+        """测试 expires_at 使用的 300 秒偏移"""
+        with self._patch_time_ns(self.NOW_NS, self.NOW_NS):
+            now = _utc_now_iso()
+            expires_at = _utc_now_iso(300)
+        self.assertEqual(expires_at, _expected_iso(self.NOW_NS + 300 * 10**9))
+        self.assertEqual(
+            datetime.fromisoformat(expires_at) - datetime.fromisoformat(now),
+            timedelta(seconds=300),
+        )
+
+    def test_offset_does_not_replace_cached_second(self):
+        """测试带偏移的调用不会覆盖当前秒的缓存"""
+        with self._patch_time_ns(self.NOW_NS, self.NOW_NS, self.NOW_NS):
+            _utc_now_iso()
+            _utc_now_iso(300)
+            self.assertEqual(_utc_now_iso(), _expected_iso(self.NOW_NS))
+
+    def test_second_rollover(self):
+        """测试跨秒时重新格式化时间前缀"""
+        base = self.NOW_NS - self.NOW_NS % 1_000_000_000
+        before = base + 999_999_999
+        after = base + 1_000_001_000
+        with self._patch_time_ns(before, after):
+            first = _utc_now_iso()
+            second = _utc_now_iso()
+        self.assertEqual(first, _expected_iso(before))
+        self.assertEqual(second, _expected_iso(after))
+        self.assertEqual(first, "2025-01-27T08:30:15.999999+00:00")
+        self.assertEqual(second, "2025-01-27T08:30:16.000001+00:00")
+
+    def test_model_timestamp_default(self):
+        """测试模型的 timestamp 默认值使用该格式"""
+        with self._patch_time_ns(self.NOW_NS):
+            contents = CartContents(
+                id="cart-1",
+                user_signature_required=False,
+                payment_request={
+                    "method_data": [],
+                    "details": {
+                        "id": "order-1",
+                        "displayItems": [],
+                        "total": {
+                            "label": "Total",
+                            "amount": {"currency": "CNY", "value": 1},
+                        },
+                    },
+                    "options": {"requestShipping": False},
+                },
+            )
+        self.assertEqual(contents.timestamp, _expected_iso(self.NOW_NS))
+
+
+if __name__ == "__main__":
+    unittest.main()
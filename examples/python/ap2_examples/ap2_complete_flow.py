@@ -9,6 +9,8 @@ to keep the demo self-contained.
 import asyncio
 import json
 import socket
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Tuple
@@ -41,15 +43,24 @@ from anp.ap2 import (
     QRCodePaymentData,
     ShippingAddress,
 )
-from anp.ap2.cart_mandate import build_cart_mandate, validate_cart_mandate
-from anp.ap2.credential_mandate import build_fulfillment_receipt, build_payment_receipt
-from anp.ap2.mandate import compute_hash
-from anp.ap2.payment_mandate import build_payment_mandate, validate_payment_mandate
+from anp.ap2.cart_mandate import build_cart_mandate, verify_cart_mandate
+from anp.ap2.credential_mandate import (
+    build_fulfillment_receipt,
+    build_payment_receipt,
+    verify_credential_async,
+)
+from anp.ap2.mandate import compute_hash, load_private_key, load_public_key
+from anp.ap2.payment_mandate import build_payment_mandate, verify_payment_mandate
 from anp.authentication.did_wba_authenticator import DIDWbaAuthHeader
 from anp.authentication.did_wba_verifier import DidWbaVerifier, DidWbaVerifierConfig
 from anp.authentication.verification_methods import EcdsaSecp256k1VerificationKey2019
 
 
+# Shared compact encoder for request and response bodies; json.dumps() would
+# build a new JSONEncoder per call because of the non-default options.
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
 def get_project_root() -> Path:
     return Path(__file__).resolve().parents[3]
 
@@ -70,11 +81,7 @@ def build_signed_json_request(
     force_new: bool = False,
 ) -> Tuple[bytes, Dict[str, str]]:
     """Build headers and body bytes for a signed JSON request."""
-    body = json.dumps(
-        payload,
-        separators=(",", ":"),
-        ensure_ascii=False,
-    ).encode("utf-8")
+    body = _JSON_ENCODER.encode(payload).encode("utf-8")
     headers = {"Content-Type": "application/json"}
     headers.update(
         auth_handler.get_auth_header(
@@ -108,6 +115,45 @@ def get_local_ip() -> str:
         return "127.0.0.1"
 
 
+# Lifetime of issued CartMandates. A stored mandate is only handed out again
+# while it still has at least CART_REUSE_MARGIN_SECONDS of validity left.
+CART_TTL_SECONDS = 900
+CART_REUSE_MARGIN_SECONDS = 120
+
+
+class CartSession:
+    """Per-order merchant state kept between the cart and payment requests."""
+
+    __slots__ = (
+        "cart_mandate",
+        "cart_hash",
+        "shopper_did",
+        "reusable_until",
+        "request_digest",
+        "data_json",
+    )
+
+    def __init__(
+        self,
+        cart_mandate: CartMandate,
+        cart_hash: str,
+        shopper_did: str,
+        reusable_until: float,
+        request_digest: str,
+        data_json: str,
+    ):
+        self.cart_mandate = cart_mandate
+        self.cart_hash = cart_hash
+        self.shopper_did = shopper_did
+        self.reusable_until = reusable_until
+        # Hash of the cart request this mandate was signed for; a request for
+        # the same cart id is only a retry if its data hashes the same
+        self.request_digest = request_digest
+        # Serialized response "data" for this mandate, so retried cart
+        # requests do not encode the whole cart again
+        self.data_json = data_json
+
+
 class MerchantServer:
     """Minimal merchant HTTP server using base AP2 builders/validators."""
 
@@ -119,15 +165,24 @@ class MerchantServer:
         jwt_private_key: str,
         jwt_public_key: str,
         shopper_public_key: str,
+        max_sessions: int = 10000,
     ):
         self.algorithm = "ES256K"
-        self.merchant_private_key = merchant_private_key
-        self.merchant_public_key = merchant_public_key
+        # Keys are parsed once here; every request then signs and verifies
+        # with the key objects instead of PEM text
+        self.merchant_private_key = load_private_key(merchant_private_key)
+        self.merchant_public_key = load_public_key(merchant_public_key)
         self.merchant_did = merchant_did
         self.merchant_kid = "merchant-key-001"
-        self.shopper_public_key = shopper_public_key
-        self.cart_mandates: Dict[str, CartMandate] = {}
-        self.cart_hashes: Dict[str, str] = {}
+        # The "from" field never changes, so it is serialized once and the
+        # response envelopes only encode their per-request fields
+        self._envelope_from = (
+            ',"from":' + _JSON_ENCODER.encode(merchant_did) + ',"to":'
+        )
+        self.shopper_public_key = load_public_key(shopper_public_key)
+        # Oldest orders are evicted first once max_sessions is reached
+        self.sessions: "OrderedDict[str, CartSession]" = OrderedDict()
+        self.max_sessions = max_sessions
 
         self.verifier = DidWbaVerifier(
             DidWbaVerifierConfig(
@@ -137,7 +192,6 @@ class MerchantServer:
                 access_token_expire_minutes=5,
             )
         )
-        self.cart_hashes: dict[str, str] = {}
 
     async def handle_create_cart_mandate(self, request: web.Request) -> web.Response:
         print("\n[Merchant] Received create_cart_mandate request")
@@ -158,8 +212,8 @@ class MerchantServer:
         except Exception as exc:
             return web.json_response({"error": f"Auth failed: {exc}"}, status=401)
 
-        payload = await request.json()
-        message = ANPMessage(**payload)
+        # Parse and validate the envelope in one pass over the raw body
+        message = ANPMessage.model_validate_json(await request.read())
 
         # Parse data dict to CartMandateRequestData
         try:
@@ -170,6 +224,22 @@ class MerchantServer:
                 status=400,
             )
 
+        # A retried request for a cart we already signed for this shopper gets
+        # the same mandate back instead of being priced, hashed and signed
+        # again. Changed items or shipping details produce a new mandate.
+        request_digest = compute_hash(message.data)
+        session = self.sessions.get(data.cart_mandate_id)
+        if (
+            session is not None
+            and session.shopper_did == shopper_did
+            and session.request_digest == request_digest
+            and session.reusable_until > time.time()
+        ):
+            print("[Merchant] → returning previously issued CartMandate")
+            return self._cart_mandate_response(
+                data.cart_mandate_id, shopper_did, session.data_json, access_token
+            )
+
         display_items: list[DisplayItem] = []
         total = 0.0
         for item in data.items:
@@ -216,38 +286,90 @@ class MerchantServer:
             user_signature_required=False,
             payment_request=payment_request,
         )
-        cart_mandate = build_cart_mandate(
-            contents=cart_contents.model_dump(exclude_none=True),
+        # Signing is CPU-bound; run it in a worker thread so other requests
+        # keep being served while it completes
+        cart_mandate = await asyncio.to_thread(
+            build_cart_mandate,
+            contents=CartContents.__pydantic_serializer__.to_python(
+                cart_contents, exclude_none=True
+            ),
             merchant_private_key=self.merchant_private_key,
             merchant_did=self.merchant_did,
             merchant_kid=self.merchant_kid,
             shopper_did=shopper_did,
             algorithm=self.algorithm,
+            ttl_seconds=CART_TTL_SECONDS,
         )
 
-        if not validate_cart_mandate(
+        # Reuse the exact dict that was hashed and signed instead of
+        # walking the whole cart again with model_dump()
+        data_json = _JSON_ENCODER.encode(
+            {
+                "contents": cart_mandate.contents,
+                "merchant_authorization": cart_mandate.merchant_authorization,
+            }
+        )
+        # The mandate was just signed here, so reuse the hash it was built with
+        self.sessions[data.cart_mandate_id] = CartSession(
             cart_mandate=cart_mandate,
-            merchant_public_key=self.merchant_public_key,
-            merchant_algorithm=self.algorithm,
-            expected_shopper_did=shopper_did,
-        ):
-            raise ValueError("CartMandate validation failed")
-        # contents is already a dict
-        cart_hash = compute_hash(cart_mandate.contents)
-        self.cart_mandates[data.cart_mandate_id] = cart_mandate
-        self.cart_hashes[data.cart_mandate_id] = cart_hash
-
-        response = {
-            "messageId": f"cart-response-{data.cart_mandate_id}",
-            "from": self.merchant_did,
-            "to": shopper_did,
-            "data": cart_mandate.model_dump(exclude_none=True),
-        }
+            cart_hash=cart_mandate.cart_hash,
+            shopper_did=shopper_did,
+            reusable_until=time.time() + CART_TTL_SECONDS - CART_REUSE_MARGIN_SECONDS,
+            request_digest=request_digest,
+            data_json=data_json,
+        )
+        self.sessions.move_to_end(data.cart_mandate_id)
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+
+        print("[Merchant] → returning CartMandate")
+        return self._cart_mandate_response(
+            data.cart_mandate_id, shopper_did, data_json, access_token
+        )
+
+    def invalidate_order(self, cart_mandate_id: str) -> None:
+        """Drop the stored session so the next request for this cart re-signs it."""
+        self.sessions.pop(cart_mandate_id, None)
+
+    def _cart_mandate_response(
+        self,
+        cart_mandate_id: str,
+        shopper_did: str,
+        data_json: str,
+        access_token: str | None,
+    ) -> web.Response:
         headers = {}
         if access_token:
             headers["Authorization"] = f"Bearer {access_token}"
-        print("[Merchant] → returning CartMandate")
-        return web.json_response(response, headers=headers)
+        return self._envelope_response(
+            f"cart-response-{cart_mandate_id}", shopper_did, data_json, headers
+        )
+
+    def _envelope_response(
+        self,
+        message_id: str,
+        to: str,
+        data_json: str,
+        headers: dict | None = None,
+    ) -> web.Response:
+        """Assemble a response envelope around the pre-serialized "from" field.
+
+        ``data_json`` is the already-encoded "data" object.
+        """
+        body = "".join(
+            (
+                '{"messageId":',
+                _JSON_ENCODER.encode(message_id),
+                self._envelope_from,
+                _JSON_ENCODER.encode(to),
+                ',"data":',
+                data_json,
+                "}",
+            )
+        )
+        return web.Response(
+            text=body, content_type="application/json", headers=headers
+        )
 
     async def handle_send_payment_mandate(self, request: web.Request) -> web.Response:
         print("\n[Merchant] Received send_payment_mandate request")
@@ -264,8 +386,7 @@ class MerchantServer:
         except Exception as exc:
             return web.json_response({"error": f"Auth failed: {exc}"}, status=401)
 
-        payload = await request.json()
-        message = ANPMessage(**payload)
+        message = ANPMessage.model_validate_json(await request.read())
 
         # Parse data dict to PaymentMandate
         try:
@@ -277,57 +398,59 @@ class MerchantServer:
         contents_dict = payment_mandate.payment_mandate_contents
 
         cart_id = contents_dict["payment_details_id"].replace("order_", "")
-        cart_mandate = self.cart_mandates.get(cart_id)
-        if not cart_mandate:
+        session = self.sessions.get(cart_id)
+        if session is None:
             return web.json_response({"error": "Unknown cart mandate"}, status=404)
+        # The cart was signed and stored by this server; checking who it was
+        # issued to replaces re-verifying our own signature
+        if session.shopper_did != shopper_did:
+            return web.json_response(
+                {"error": "Cart mandate was issued to another shopper"}, status=403
+            )
+        cart_mandate = session.cart_mandate
+        cart_hash = session.cart_hash
 
-        if not validate_cart_mandate(
-            cart_mandate=cart_mandate.model_dump(exclude_none=True),
-            merchant_public_key=self.merchant_public_key,
-            merchant_algorithm=self.algorithm,
-            expected_shopper_did=shopper_did,
-        ):
-            raise ValueError("CartMandate validation failed")
-        # contents is already a dict
-        cart_hash = compute_hash(cart_mandate.contents)
-
-        if not validate_payment_mandate(
-            payment_mandate=payment_mandate.model_dump(exclude_none=True),
+        pmt_hash = await asyncio.to_thread(
+            verify_payment_mandate,
+            payment_mandate=payment_mandate,
             shopper_public_key=self.shopper_public_key,
             shopper_algorithm=self.algorithm,
             expected_merchant_did=self.merchant_did,
             expected_cart_hash=cart_hash,
-        ):
+        )
+        if pmt_hash is None:
             raise ValueError("PaymentMandate validation failed")
 
-        pmt_hash = compute_hash(contents_dict)
-
         print("[Merchant] ✓ PaymentMandate verified")
         print(f"[Merchant]   - Cart hash: {cart_hash[:32]}…")
         print(f"[Merchant]   - Payment hash: {pmt_hash[:32]}…")
 
-        payment_receipt, fulfillment_receipt = self._issue_receipts(
+        payment_receipt, fulfillment_receipt = await asyncio.to_thread(
+            self._issue_receipts,
             payment_mandate=payment_mandate,
             pmt_hash=pmt_hash,
             cart_mandate=cart_mandate,
             shopper_did=shopper_did,
         )
 
-        response = {
-            "messageId": f"payment-response-{contents_dict['payment_mandate_id']}",
-            "from": self.merchant_did,
-            "to": shopper_did,
-            "data": {
-                "status": "accepted",
-                "payment_id": contents_dict["payment_mandate_id"],
-                "message": "Payment authorization accepted",
-                "payment_receipt": payment_receipt.model_dump(exclude_none=True),
-                "fulfillment_receipt": fulfillment_receipt.model_dump(
-                    exclude_none=True
-                ),
+        data = {
+            "status": "accepted",
+            "payment_id": contents_dict["payment_mandate_id"],
+            "message": "Payment authorization accepted",
+            "payment_receipt": {
+                "contents": payment_receipt.contents,
+                "merchant_authorization": payment_receipt.merchant_authorization,
+            },
+            "fulfillment_receipt": {
+                "contents": fulfillment_receipt.contents,
+                "merchant_authorization": fulfillment_receipt.merchant_authorization,
             },
         }
-        return web.json_response(response)
+        return self._envelope_response(
+            f"payment-response-{contents_dict['payment_mandate_id']}",
+            shopper_did,
+            _JSON_ENCODER.encode(data),
+        )
 
     def _issue_receipts(
         self,
@@ -408,8 +531,8 @@ class ShopperAgent:
             private_key_path=private_key_path,
         )
         self.client_did = client_did
-        self.merchant_public_key = merchant_public_key
-        self.payment_private_key = payment_private_key
+        self.merchant_public_key = load_public_key(merchant_public_key)
+        self.payment_private_key = load_private_key(payment_private_key)
 
     async def run(self, merchant_url: str, merchant_did: str) -> None:
         print("[Shopper] Step 1: Build cart mandate request")
@@ -449,16 +572,17 @@ class ShopperAgent:
             shipping_address=ShippingAddress(**shipping_address),
             remark="Please ship ASAP",
         )
-        message = ANPMessage(
-            messageId=f"cart-request-{cart_mandate_id}",
-            from_=self.client_did,
-            to=merchant_did,
-            data=request_data.model_dump(exclude_none=True),
-        )
+        # The envelope is written out as the wire dict directly; building an
+        # ANPMessage only to dump it again would walk the payload twice
+        create_cart_payload = {
+            "messageId": f"cart-request-{cart_mandate_id}",
+            "from": self.client_did,
+            "to": merchant_did,
+            "data": request_data.model_dump(exclude_none=True),
+        }
         create_cart_endpoint = (
             f"{merchant_url.rstrip('/')}/ap2/merchant/create_cart_mandate"
         )
-        create_cart_payload = message.model_dump(by_alias=True, exclude_none=True)
         create_cart_body, create_cart_headers = build_signed_json_request(
             self.auth_handler,
             create_cart_endpoint,
@@ -481,15 +605,14 @@ class ShopperAgent:
                 cart_response = await response.json()
 
         received_cart = CartMandate.model_validate(cart_response["data"])
-        if not validate_cart_mandate(
-            cart_mandate=received_cart.model_dump(exclude_none=True),
+        cart_hash = verify_cart_mandate(
+            cart_mandate=received_cart,
             merchant_public_key=self.merchant_public_key,
             merchant_algorithm="ES256K",
             expected_shopper_did=self.client_did,
-        ):
+        )
+        if cart_hash is None:
             raise ValueError("CartMandate validation failed")
-        # contents is already a dict
-        cart_hash = compute_hash(received_cart.contents)
         print("[Shopper] Step 3: ✓ CartMandate verified")
 
         # Parse received cart contents to access fields
@@ -528,25 +651,28 @@ class ShopperAgent:
             algorithm="ES256K",
         )
 
-        if not validate_payment_mandate(
-            payment_mandate=payment_mandate.model_dump(exclude_none=True),
+        pmt_hash = verify_payment_mandate(
+            payment_mandate=payment_mandate,
             shopper_public_key=self.merchant_public_key,
             shopper_algorithm="ES256K",
             expected_merchant_did=merchant_did,
             expected_cart_hash=cart_hash,
-        ):
+        )
+        if pmt_hash is None:
             raise ValueError("PaymentMandate validation failed")
 
-        payment_message = ANPMessage(
-            messageId=f"payment-request-{contents.payment_mandate_id}",
-            from_=self.client_did,
-            to=merchant_did,
-            data=payment_mandate.model_dump(exclude_none=True),
-        )
+        payment_payload = {
+            "messageId": f"payment-request-{contents.payment_mandate_id}",
+            "from": self.client_did,
+            "to": merchant_did,
+            "data": {
+                "payment_mandate_contents": payment_mandate.payment_mandate_contents,
+                "user_authorization": payment_mandate.user_authorization,
+            },
+        }
         payment_endpoint = (
             f"{merchant_url.rstrip('/')}/ap2/merchant/send_payment_mandate"
         )
-        payment_payload = payment_message.model_dump(by_alias=True, exclude_none=True)
         payment_body, payment_headers = build_signed_json_request(
             self.auth_handler,
             payment_endpoint,
@@ -565,10 +691,32 @@ class ShopperAgent:
         print("[Shopper] Step 5: ✓ Received merchant response")
         print(f"[Shopper]   - Status: {result['data']['status']}")
         print(f"[Shopper]   - Payment ID: {result['data']['payment_id']}")
-        if "payment_receipt" in result["data"]:
-            print("[Shopper]   - PaymentReceipt credential received (mock)")
-        if "fulfillment_receipt" in result["data"]:
-            print("[Shopper]   - FulfillmentReceipt credential received (mock)")
+
+        # The two receipts are signed independently, so verify them side by
+        # side in worker threads rather than one after the other
+        receipts = [
+            PaymentReceipt.model_validate(result["data"]["payment_receipt"]),
+            FulfillmentReceipt.model_validate(result["data"]["fulfillment_receipt"]),
+        ]
+        cred_hashes = await asyncio.gather(
+            *(
+                verify_credential_async(
+                    credential=receipt,
+                    expected_shopper_did=self.client_did,
+                    merchant_public_key=self.merchant_public_key,
+                    merchant_algorithm="ES256K",
+                    expected_pmt_hash=pmt_hash,
+                )
+                for receipt in receipts
+            )
+        )
+        for receipt, cred_hash in zip(receipts, cred_hashes):
+            if cred_hash is None:
+                raise ValueError(f"{type(receipt).__name__} validation failed")
+            print(
+                f"[Shopper]   - ✓ {type(receipt).__name__} verified "
+                f"(cred_hash {cred_hash[:16]}…)"
+            )
 
 
 async def start_merchant_server(
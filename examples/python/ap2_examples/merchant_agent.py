@@ -10,8 +10,11 @@ Design Philosophy:
 - Pure functions: Predictable, testable, composable
 """
 
+import asyncio
 import logging
-from typing import Any, Optional, Sequence
+from typing import Any, List, Mapping, Optional, Sequence, Union
+
+from pydantic import TypeAdapter, ValidationError
 
 from anp.ap2 import (
     ANPMessage,
@@ -36,11 +39,14 @@ from anp.ap2.credential_mandate import (
     build_fulfillment_receipt,
     build_payment_receipt,
 )
-from anp.ap2.mandate import compute_hash
-from anp.ap2.payment_mandate import validate_payment_mandate
+from anp.ap2.mandate import load_private_key
+from anp.ap2.payment_mandate import verify_payment_mandate
 
 logger = logging.getLogger(__name__)
 
+# Validates a whole item list in one call instead of one model per item.
+_DISPLAY_ITEMS_ADAPTER = TypeAdapter(List[DisplayItem])
+
 
 class MerchantAgent:
     """Stateless AP2 Merchant Agent.
@@ -60,7 +66,7 @@ class MerchantAgent:
         merchant_private_key: str,
         merchant_did: str,
         merchant_kid: str,
-        algorithm: str = "RS256",
+        algorithm: str = "ES256K",
     ):
         """Initialize the Merchant Agent.
 
@@ -68,13 +74,17 @@ class MerchantAgent:
             merchant_private_key: Merchant's private key for JWS signing
             merchant_did: Merchant's DID
             merchant_kid: Merchant's key ID for JWS signing
-            algorithm: JWT algorithm (RS256 or ES256K)
+            algorithm: JWT algorithm (default: ES256K). ES256 and EdDSA
+                (Ed25519) keys sign several times faster; RS256 remains
+                available for RSA keys but is the slowest option.
 
         Note:
             This agent is STATELESS. It does not store sessions or business data.
             You must manage cart_hash, pmt_hash, and other state yourself.
         """
         self.merchant_private_key = merchant_private_key
+        # Parsed once so every mandate and receipt signs with the key object
+        self._signing_key = load_private_key(merchant_private_key)
         self.merchant_did = merchant_did
         self.merchant_kid = merchant_kid
         self.algorithm = algorithm
@@ -82,11 +92,14 @@ class MerchantAgent:
     def verify_cart_mandate_request(
         self,
         request: ANPMessage,
+        as_dict: bool = False,
     ) -> dict[str, Any]:
         """Verify an incoming cart creation request.
 
         Args:
             request: ANPMessage containing CartMandateRequestData
+            as_dict: Return items and shipping address as plain dicts instead
+                of the validated DisplayItem / ShippingAddress models
 
         Returns:
             Dict containing extracted business data
@@ -106,12 +119,19 @@ class MerchantAgent:
                 f"Invalid message data type: expected CartMandateRequestData, got {e}"
             ) from e
 
+        if as_dict:
+            # One dump for the whole subtree rather than one per item
+            dumped = data.model_dump(include={"items", "shipping_address"})
+            items = dumped["items"]
+            shipping_address = dumped["shipping_address"]
+        else:
+            items = data.items
+            shipping_address = data.shipping_address
+
         return {
             "cart_mandate_id": data.cart_mandate_id,
-            "items": [item.model_dump() for item in data.items],
-            "shipping_address": data.shipping_address.model_dump()
-            if data.shipping_address
-            else None,
+            "items": items,
+            "shipping_address": shipping_address,
             "client_did": request.from_,
             "webhook_url": request.credential_webhook_url,
         }
@@ -119,7 +139,7 @@ class MerchantAgent:
     def build_cart_mandate_response(
         self,
         order_id: str,
-        items: Sequence[DisplayItem],
+        items: Sequence[Union[DisplayItem, Mapping[str, Any]]],
         total_amount: MoneyAmount,
         shopper_did: Optional[str] = None,
         payment_method: str = "QR_CODE",
@@ -136,7 +156,8 @@ class MerchantAgent:
 
         Args:
             order_id: Order unique identifier
-            items: List of items with full details
+            items: List of items with full details, as DisplayItem models or
+                equivalent dicts (validated in a single pass)
             total_amount: Total amount as MoneyAmount model
             shopper_did: Shopper's DID
             payment_method: Payment method (default: QR_CODE)
@@ -148,20 +169,29 @@ class MerchantAgent:
 
         Returns:
             ANPMessage containing the CartMandate
+
+        Raises:
+            ValueError: If shopper_did is not provided
+            TypeError: If an item is not a valid DisplayItem (model or dict), or
+                total_amount is not a MoneyAmount
         """
         resolved_shopper_did = shopper_did
         if not resolved_shopper_did:
             raise ValueError("shopper_did or request_from must be provided")
 
-        resolved_message_id = f"cart-response-{order_id}"
+        resolved_message_id = "cart-response-" + order_id
 
-        if not all(isinstance(item, DisplayItem) for item in items):
-            raise TypeError("All items must be DisplayItem instances")
+        try:
+            display_items = _DISPLAY_ITEMS_ADAPTER.validate_python(list(items))
+        except ValidationError as e:
+            raise TypeError(
+                f"All items must be DisplayItem instances or equivalent dicts: {e}"
+            ) from e
 
         if not isinstance(total_amount, MoneyAmount):
             raise TypeError("total_amount must be a MoneyAmount instance")
 
-        logger.info(f"Building CartMandate for order_id={order_id}")
+        logger.info("Building CartMandate for order_id=%s", order_id)
         provider = payment_channel
 
         # Ensure provider is PaymentProvider enum
@@ -183,7 +213,7 @@ class MerchantAgent:
             ],
             details=PaymentDetails(
                 id=order_id,
-                displayItems=list(items),
+                displayItems=display_items,
                 total=PaymentDetailsTotal(label="Total", amount=total_amount),
                 shipping_address=shipping_address,
             ),
@@ -191,14 +221,16 @@ class MerchantAgent:
         )
 
         contents = CartContents(
-            id=f"cart_{order_id}",
+            id="cart_" + order_id,
             user_signature_required=False,
             payment_request=payment_request,
         )
 
         cart_mandate_obj = build_cart_mandate(
-            contents=contents.model_dump(exclude_none=True),
-            merchant_private_key=self.merchant_private_key,
+            contents=CartContents.__pydantic_serializer__.to_python(
+                contents, exclude_none=True
+            ),
+            merchant_private_key=self._signing_key,
             merchant_did=self.merchant_did,
             merchant_kid=self.merchant_kid,
             shopper_did=resolved_shopper_did,
@@ -210,13 +242,50 @@ class MerchantAgent:
             messageId=resolved_message_id,
             **{"from": self.merchant_did},
             to=resolved_shopper_did,
-            data=cart_mandate_obj.model_dump(exclude_none=True),
+            # contents is already the exclude_none dump signed above; reuse it
+            # rather than walking the whole cart again with model_dump()
+            data={
+                "contents": cart_mandate_obj.contents,
+                "merchant_authorization": cart_mandate_obj.merchant_authorization,
+            },
         )
 
-        logger.debug(f"CartMandate built successfully for order_id={order_id}")
+        logger.debug("CartMandate built successfully for order_id=%s", order_id)
 
         return response
 
+    async def build_cart_mandate_response_async(
+        self,
+        order_id: str,
+        items: Sequence[Union[DisplayItem, Mapping[str, Any]]],
+        total_amount: MoneyAmount,
+        shopper_did: Optional[str] = None,
+        payment_method: str = "QR_CODE",
+        payment_channel: PaymentProvider | str = PaymentProvider.ALIPAY,
+        qr_url: str = "",
+        out_trade_no: str = "",
+        shipping_address: Optional[ShippingAddress] = None,
+        ttl_seconds: int = 900,
+    ) -> ANPMessage:
+        """Run build_cart_mandate_response in a worker thread.
+
+        Signing is CPU-bound; async handlers should await this so the event
+        loop keeps serving other requests.
+        """
+        return await asyncio.to_thread(
+            self.build_cart_mandate_response,
+            order_id=order_id,
+            items=items,
+            total_amount=total_amount,
+            shopper_did=shopper_did,
+            payment_method=payment_method,
+            payment_channel=payment_channel,
+            qr_url=qr_url,
+            out_trade_no=out_trade_no,
+            shipping_address=shipping_address,
+            ttl_seconds=ttl_seconds,
+        )
+
     def verify_payment_mandate(
         self,
         request: ANPMessage,
@@ -242,7 +311,7 @@ class MerchantAgent:
             TypeError: If the message data payload is not a PaymentMandate
 
         """
-        logger.info(f"Verifying ANPMessage with PaymentMandate from {request.from_}")
+        logger.info("Verifying ANPMessage with PaymentMandate from %s", request.from_)
 
         # Verify ANP message routing
         if request.to != self.merchant_did:
@@ -258,25 +327,40 @@ class MerchantAgent:
             raise TypeError(
                 f"Invalid message data type: expected PaymentMandate, got {e}"
             ) from e
-        logger.debug(f"Expected cart_hash: {cart_hash[:16]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Expected cart_hash: %s...", cart_hash[:16])
 
-        # Verify payment mandate signature and hash chain
-        if not validate_payment_mandate(
+        # Verify payment mandate signature and hash chain; the verified
+        # pmt_hash is returned directly, so contents are hashed only once
+        pmt_hash = verify_payment_mandate(
             payment_mandate=payment_mandate,
             shopper_public_key=shopper_public_key,
             shopper_algorithm=self.algorithm,
             expected_merchant_did=self.merchant_did,
             expected_cart_hash=cart_hash,
-        ):
+        )
+        if pmt_hash is None:
             raise ValueError("PaymentMandate validation failed")
 
-        # Compute pmt_hash for caller
-        # payment_mandate_contents is already a dict
-        pmt_hash = compute_hash(payment_mandate.payment_mandate_contents)
-        logger.info("PaymentMandate verified: pmt_hash=%s...", pmt_hash[:16])
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("PaymentMandate verified: pmt_hash=%s...", pmt_hash[:16])
 
         return {"pmt_hash": pmt_hash}
 
+    async def verify_payment_mandate_async(
+        self,
+        request: ANPMessage,
+        cart_hash: str,
+        shopper_public_key: str,
+    ) -> dict[str, Any]:
+        """Run verify_payment_mandate in a worker thread."""
+        return await asyncio.to_thread(
+            self.verify_payment_mandate,
+            request=request,
+            cart_hash=cart_hash,
+            shopper_public_key=shopper_public_key,
+        )
+
     def build_payment_receipt(
         self,
         payment_receipt_contents: Any,
@@ -303,7 +387,7 @@ class MerchantAgent:
         return build_payment_receipt(
             contents=payment_receipt_contents,
             pmt_hash=pmt_hash,
-            merchant_private_key=self.merchant_private_key,
+            merchant_private_key=self._signing_key,
             merchant_did=self.merchant_did,
             merchant_kid=self.merchant_kid,
             algorithm=self.algorithm,
@@ -311,6 +395,22 @@ class MerchantAgent:
             ttl_seconds=ttl_seconds,
         )
 
+    async def build_payment_receipt_async(
+        self,
+        payment_receipt_contents: Any,
+        pmt_hash: str,
+        shopper_did: str,
+        ttl_seconds: int = 15552000,
+    ) -> PaymentReceipt:
+        """Run build_payment_receipt in a worker thread."""
+        return await asyncio.to_thread(
+            self.build_payment_receipt,
+            payment_receipt_contents=payment_receipt_contents,
+            pmt_hash=pmt_hash,
+            shopper_did=shopper_did,
+            ttl_seconds=ttl_seconds,
+        )
+
     def build_fulfillment_receipt(
         self,
         fulfillment_receipt_contents: Any,
@@ -337,7 +437,7 @@ class MerchantAgent:
         return build_fulfillment_receipt(
             contents=fulfillment_receipt_contents,
             pmt_hash=pmt_hash,
-            merchant_private_key=self.merchant_private_key,
+            merchant_private_key=self._signing_key,
             merchant_did=self.merchant_did,
             merchant_kid=self.merchant_kid,
             algorithm=self.algorithm,
@@ -345,5 +445,21 @@ class MerchantAgent:
             ttl_seconds=ttl_seconds,
         )
 
+    async def build_fulfillment_receipt_async(
+        self,
+        fulfillment_receipt_contents: Any,
+        pmt_hash: str,
+        shopper_did: str,
+        ttl_seconds: int = 15552000,
+    ) -> FulfillmentReceipt:
+        """Run build_fulfillment_receipt in a worker thread."""
+        return await asyncio.to_thread(
+            self.build_fulfillment_receipt,
+            fulfillment_receipt_contents=fulfillment_receipt_contents,
+            pmt_hash=pmt_hash,
+            shopper_did=shopper_did,
+            ttl_seconds=ttl_seconds,
+        )
+
 
 __all__ = ["MerchantAgent"]
@@ -12,13 +12,12 @@ The Shopper Agent handles the client-side workflow:
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from typing import Any, Callable, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Tuple, Union
 
 import aiohttp
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
 
 from anp.ap2 import (
     CartMandate,
@@ -32,26 +31,57 @@ from anp.ap2 import (
     PaymentResponseDetails,
     ShippingAddress,
 )
-from anp.ap2.cart_mandate import validate_cart_mandate
-from anp.ap2.credential_mandate import validate_credential
-from anp.ap2.mandate import compute_hash
+from anp.ap2.cart_mandate import verify_cart_mandate
+from anp.ap2.credential_mandate import verify_credential_async
+from anp.ap2.mandate import load_private_key, load_public_key
 from anp.ap2.payment_mandate import build_payment_mandate
 from anp.authentication import DIDWbaAuthHeader
 
+try:
+    # The webhook handler's annotations are strings (postponed evaluation)
+    # and FastAPI resolves them against module globals. starlette.requests
+    # is the same Request class FastAPI re-exports, without the cost of
+    # importing fastapi itself.
+    from starlette.requests import Request
+except ImportError:  # pragma: no cover - FastAPI (and Starlette) not installed
+    Request = None
+
+if TYPE_CHECKING:
+    from fastapi import APIRouter
+
 logger = logging.getLogger(__name__)
 
+# Shared compact encoder for request bodies; json.dumps() would build a new
+# JSONEncoder per call because of the non-default options.
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
 
 class ShopperAgent:
-    """Stateless AP2 Shopper Agent.
+    """AP2 Shopper Agent.
 
     This agent provides protocol-level operations for a shopper, such as
-    building mandates and verifying credentials. It does not manage state
-    (like `cart_hash` or `pmt_hash`) or handle HTTP communication.
-
-    Design:
-    - Stateless: No instance variables for business data.
-    - Pure Methods: Methods are deterministic. Same input -> same output.
-    - Your Responsibility: State management, database/cache, and HTTP clients.
+    building mandates, sending them to the merchant and verifying credentials.
+    It remembers the last verified `cart_hash` and `pmt_hash`; persisting
+    orders and business data remains the caller's responsibility.
+
+    HTTP session lifecycle:
+    `send_payment_mandate` reuses one pooled `aiohttp.ClientSession`, opened
+    lazily on the first request, so connections to the merchant are kept
+    alive between calls. The session must be closed when the agent is no
+    longer needed, either by using the agent as an async context manager or
+    by awaiting `close()` explicitly; otherwise aiohttp warns about an
+    unclosed client session::
+
+        async with ShopperAgent(...) as shopper:
+            await shopper.send_payment_mandate(...)
+
+        shopper = ShopperAgent(...)
+        try:
+            await shopper.send_payment_mandate(...)
+        finally:
+            await shopper.close()
+
+    A closed agent can be used again; the next request opens a new session.
     """
 
     def __init__(
@@ -63,9 +93,9 @@ class ShopperAgent:
         *,
         did_document_path: str | None = None,
         auth_private_key_path: str | None = None,
-        algorithm: str = "RS256",
+        algorithm: str = "ES256K",
     ):
-        """Initialize the stateless Shopper Agent.
+        """Initialize the Shopper Agent.
 
         Args:
             shopper_private_key: Shopper's private key for JWS signing.
@@ -74,15 +104,24 @@ class ShopperAgent:
             merchant_public_key: Merchant public key for credential validation.
             did_document_path: Path to DID document for DIDWbaAuthHeader (optional).
             auth_private_key_path: Private key path for DIDWbaAuthHeader (optional).
-            algorithm: JWS algorithm (e.g., "RS256").
+            algorithm: JWS algorithm (default: ES256K). ECDSA keys sign much
+                faster than RSA and produce shorter JWS tokens.
         """
         self.shopper_private_key = shopper_private_key
+        # Parsed once so each PaymentMandate signs with the key object
+        self._signing_key = load_private_key(shopper_private_key)
         self.shopper_did = shopper_did
         self.shopper_kid = shopper_kid
         self.merchant_public_key = merchant_public_key
+        # Parsed once so credential verification never touches the PEM again
+        self._merchant_verify_key = load_public_key(merchant_public_key)
         self.algorithm = algorithm
         self.cart_hash: Optional[str] = None
         self.pmt_hash: Optional[str] = None
+        self.credential_callback: Optional[
+            Callable[[Union[PaymentReceipt, FulfillmentReceipt]], None]
+        ] = None
+        self._http_session: Optional[aiohttp.ClientSession] = None
         self.auth_header = (
             DIDWbaAuthHeader(
                 did_document_path=did_document_path,
@@ -92,6 +131,31 @@ class ShopperAgent:
             else None
         )
 
+    async def __aenter__(self) -> "ShopperAgent":
+        """Enter the agent context; the HTTP session is closed on exit."""
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session, if one was opened."""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use.
+
+        Reusing one session keeps TCP/TLS connections to the merchant pooled
+        instead of paying a fresh handshake on every request.
+        """
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+            )
+        return self._http_session
+
     def verify_cart_mandate(
         self,
         cart_mandate: CartMandate,
@@ -113,18 +177,18 @@ class ShopperAgent:
             ValueError: If the signature is invalid or the mandate is not
                         intended for the current shopper.
         """
-        if not validate_cart_mandate(
+        cart_hash = verify_cart_mandate(
             cart_mandate=cart_mandate,
             merchant_public_key=merchant_public_key,
             merchant_algorithm=self.algorithm,
             expected_shopper_did=self.shopper_did,
-        ):
+        )
+        if cart_hash is None:
             raise ValueError("CartMandate validation failed")
 
-        # contents is already a dict
-        cart_hash = compute_hash(cart_mandate.contents)
         self.cart_hash = cart_hash
-        logger.info("CartMandate verified: cart_hash=%s...", cart_hash[:16])
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("CartMandate verified: cart_hash=%s...", cart_hash[:16])
 
         return {"cart_hash": cart_hash}
 
@@ -139,7 +203,7 @@ class ShopperAgent:
         merchant_agent: str = "MerchantAgent",
         refund_period: int = 30,
         shipping_address: Optional[dict[str, str]] = None,
-        algorithm: str = "RS256",
+        algorithm: Optional[str] = None,
     ) -> PaymentMandate:
         """Build a PaymentMandate using stored cart_hash.
 
@@ -153,7 +217,7 @@ class ShopperAgent:
             merchant_agent: Merchant agent identifier
             refund_period: Refund period in days
             shipping_address: Shipping address (optional)
-            algorithm: JWT algorithm
+            algorithm: JWT algorithm (default: the agent's algorithm)
 
         Returns:
             PaymentMandate ready to send
@@ -207,23 +271,24 @@ class ShopperAgent:
             cart_hash=cart_hash,
         )
 
-        contents_dict = contents.model_dump(exclude_none=True)
-        self.pmt_hash = compute_hash(contents_dict)
-
-        return build_payment_mandate(
-            contents=contents,
-            user_private_key=self.shopper_private_key,
-            user_did=self.shopper_did,
-            user_kid=self.shopper_kid,
+        payment_mandate = build_payment_mandate(
+            contents=contents.model_dump(exclude_none=True),
+            shopper_private_key=self._signing_key,
+            shopper_did=self.shopper_did,
+            shopper_kid=self.shopper_kid,
             merchant_did=merchant_did,
-            algorithm=algorithm,
+            algorithm=algorithm or self.algorithm,
         )
+        self.pmt_hash = payment_mandate.pmt_hash
+
+        return payment_mandate
 
     async def send_payment_mandate(
         self,
         merchant_url: str,
         merchant_did: str,
         payment_mandate: PaymentMandate,
+        reuse_auth: bool = True,
     ) -> dict[str, Any]:
         """Send a PaymentMandate to the merchant.
 
@@ -231,6 +296,9 @@ class ShopperAgent:
             merchant_url: Merchant API base URL (e.g., https://merchant.example.com)
             merchant_did: Merchant DID
             payment_mandate: Payment mandate object
+            reuse_auth: Reuse the Bearer token the merchant issued on an earlier
+                request instead of signing a fresh DID-WBA header (default: True).
+                Falls back to a fresh signature if the token is rejected.
 
         Returns:
             Dict: Response data from the merchant
@@ -245,15 +313,15 @@ class ShopperAgent:
         # Build request URL
         endpoint = f"{merchant_url.rstrip('/')}/ap2/merchant/send_payment_mandate"
 
-        # Build request data
+        # Build request data. The contents dict is exactly what pmt_hash was
+        # computed over, so it is sent as-is: pruning or re-dumping fields
+        # here would break the merchant's hash check.
         request_data = {
-            "messageId": f"payment-mandate-{payment_mandate.payment_mandate_contents.payment_mandate_id}",
+            "messageId": "payment-mandate-" + payment_mandate.id,
             "from": self.shopper_did,
             "to": merchant_did,
             "data": {
-                "payment_mandate_contents": payment_mandate.payment_mandate_contents.model_dump(
-                    exclude_none=True
-                ),
+                "payment_mandate_contents": payment_mandate.payment_mandate_contents,
                 "user_authorization": payment_mandate.user_authorization,
             },
         }
@@ -261,24 +329,72 @@ class ShopperAgent:
         request_body, request_headers = self._build_signed_json_request(
             endpoint,
             request_data,
-            force_new=True,
+            force_new=not reuse_auth,
         )
 
-        # Send HTTP POST request
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
+        # Send HTTP POST request over the pooled session
+        session = await self._get_http_session()
+        response = await session.post(
+            endpoint,
+            data=request_body,
+            headers=request_headers,
+        )
+        if response.status == 401 and request_headers.get(
+            "Authorization", ""
+        ).startswith("Bearer "):
+            # Cached token expired or was revoked: sign this request afresh
+            response.release()
+            self.auth_header.clear_token(endpoint)
+            request_body, request_headers = self._build_signed_json_request(
+                endpoint,
+                request_data,
+                force_new=True,
+            )
+            response = await session.post(
                 endpoint,
                 data=request_body,
                 headers=request_headers,
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(
-                        f"Failed to send payment mandate: HTTP {response.status}, {error_text}"
-                    )
+            )
+
+        async with response:
+            # Keep the Bearer token the merchant returns for later requests
+            self.auth_header.update_token(endpoint, dict(response.headers))
+
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(
+                    f"Failed to send payment mandate: HTTP {response.status}, {error_text}"
+                )
+
+            # Parse the raw body directly; skips aiohttp's content-type check
+            # and charset sniffing in response.json()
+            return json.loads(await response.read())
+
+    async def send_payment_mandates_bulk(
+        self,
+        requests: Iterable[Tuple[str, str, PaymentMandate]],
+        max_concurrency: int = 16,
+    ) -> list[dict[str, Any]]:
+        """Send several PaymentMandates concurrently over the pooled session.
+
+        Args:
+            requests: (merchant_url, merchant_did, payment_mandate) tuples
+            max_concurrency: Maximum number of requests in flight at once
 
-                result = await response.json()
-                return result
+        Returns:
+            List of merchant responses, in the same order as ``requests``
+
+        Raises:
+            Exception: The first failure among the requests, as raised by
+                send_payment_mandate
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def send_one(request: Tuple[str, str, PaymentMandate]) -> dict[str, Any]:
+            async with semaphore:
+                return await self.send_payment_mandate(*request)
+
+        return await asyncio.gather(*(send_one(request) for request in requests))
 
     # =========================================================================
     # FastAPI Router Integration
@@ -304,11 +420,7 @@ class ShopperAgent:
         force_new: bool = False,
     ) -> tuple[bytes, dict[str, str]]:
         """Build headers and body bytes for a signed JSON request."""
-        body = json.dumps(
-            payload,
-            separators=(",", ":"),
-            ensure_ascii=False,
-        ).encode("utf-8")
+        body = _JSON_ENCODER.encode(payload).encode("utf-8")
         headers: dict[str, str] = {"Content-Type": "application/json"}
         if self.auth_header is not None:
             headers.update(
@@ -335,6 +447,10 @@ class ShopperAgent:
             APIRouter ready to be included in FastAPI app
 
         """
+        # FastAPI is only needed when serving the webhook; importing it here
+        # keeps it out of the import cost of ShopperAgent itself
+        from fastapi import APIRouter, HTTPException
+        from fastapi.responses import JSONResponse
 
         router = APIRouter(prefix=prefix)
 
@@ -345,8 +461,10 @@ class ShopperAgent:
                 # Parse request body
                 body = await request.json()
                 credential_data = body.get("data", {})
-                credential_type = credential_data.get("type")
-                logger.info(f"Received credential of type: {credential_type}")
+                credential_type = credential_data.get("contents", {}).get(
+                    "credential_type"
+                )
+                logger.info("Received credential of type: %s", credential_type)
 
                 # Parse credential based on type
                 if credential_type == "PaymentReceipt":
@@ -354,13 +472,13 @@ class ShopperAgent:
                 elif credential_type == "FulfillmentReceipt":
                     credential = FulfillmentReceipt.model_validate(credential_data)
                 else:
-                    logger.warning(f"Unknown credential type: {credential_type}")
+                    logger.warning("Unknown credential type: %s", credential_type)
                     raise HTTPException(
                         status_code=400,
                         detail=f"Unknown credential type: {credential_type}",
                     )
 
-                # Verify credential (will raise ValueError if verification fails)
+                # Verify credential against the hash chain
                 if not self.cart_hash or not self.pmt_hash:
                     logger.error("Hash chain incomplete: missing cart_hash or pmt_hash")
                     raise HTTPException(
@@ -370,16 +488,17 @@ class ShopperAgent:
 
                 logger.debug("Validating credential signature and hash chain")
 
-                _ = validate_credential(
+                verified_cred_hash = await verify_credential_async(
                     credential=credential,
-                    merchant_public_key=self.merchant_public_key,
+                    merchant_public_key=self._merchant_verify_key,
                     merchant_algorithm=self.algorithm,
                     expected_shopper_did=self.shopper_did,
                     expected_pmt_hash=self.pmt_hash,
                 )
-                verified_cred_hash = compute_hash(
-                    credential.contents.model_dump(exclude_none=True)
-                )
+                if verified_cred_hash is None:
+                    raise ValueError(
+                        "signature, cred_hash or pmt_hash check did not pass"
+                    )
                 logger.info("Credential verified successfully")
 
                 # Call callback if set
@@ -393,14 +512,14 @@ class ShopperAgent:
                     content={
                         "status": "success",
                         "message": "Credential received and verified",
-                        "credential_id": getattr(credential.contents, "id", None),
+                        "credential_id": credential.contents.get("id"),
                         "credential_type": credential_type,
                         "cred_hash": verified_cred_hash,
                     },
                 )
 
             except ValueError as e:
-                logger.warning(f"Credential verification failed: {str(e)}")
+                logger.warning("Credential verification failed: %s", e)
                 raise HTTPException(
                     status_code=400, detail=f"Verification failed: {str(e)}"
                 )
@@ -408,7 +527,7 @@ class ShopperAgent:
                 raise
             except Exception as e:
                 logger.error(
-                    f"Internal error processing credential: {str(e)}", exc_info=True
+                    "Internal error processing credential: %s", e, exc_info=True
                 )
                 raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 